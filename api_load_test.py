@@ -0,0 +1,160 @@
+"""
+Test de charge du service HTTP des statistiques (latences p50/p99)
+
+    python3 api_load_test.py --url http://127.0.0.1:8000 --requests 2000 --concurrency 16
+    python3 api_load_test.py --start --etag
+"""
+
+import argparse
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+DEFAULT_URL = 'http://127.0.0.1:8000'
+DEFAULT_REQUESTS = 2000
+DEFAULT_CONCURRENCY = 16
+DEFAULT_SEED = 42
+
+# Requêtes représentatives : points d'accès × sélections de filtres
+ENDPOINTS = ['/stats', '/hotels', '/monthly', '/countries?n=10']
+FILTERS = [
+    '',
+    'hotel=City%20Hotel',
+    'hotel=Resort%20Hotel',
+    'year=2016',
+    'hotel=City%20Hotel&year=2016,2017',
+    'month=July,August',
+    'segment=Online%20TA',
+    'deposit=Non%20Refund',
+    'hotel=Resort%20Hotel&month=December&segment=Groups',
+]
+
+
+def request_mix(n_requests, seed=DEFAULT_SEED):
+    """Suite reproductible de chemins de requêtes"""
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(n_requests):
+        endpoint, filters = rng.choice(ENDPOINTS), rng.choice(FILTERS)
+        separator = '&' if '?' in endpoint else '?'
+        paths.append(endpoint + (separator + filters if filters else ''))
+    return paths
+
+
+class _Client(threading.local):
+    """Une connexion persistante (keep-alive) par thread, avec les ETag reçus"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.connection = None
+        self.etags = {}
+
+    def get(self, path, send_etag):
+        headers = {}
+        if send_etag and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.connection.request('GET', path, headers=headers)
+                response = self.connection.getresponse()
+                response.read()
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # Connexion fermée par le serveur : une seule nouvelle tentative
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        etag = response.getheader('ETag')
+        if etag:
+            self.etags[path] = etag
+        return response.status
+
+
+def run_load_test(url, n_requests=DEFAULT_REQUESTS, concurrency=DEFAULT_CONCURRENCY,
+                  send_etag=False, seed=DEFAULT_SEED):
+    """Envoie les requêtes en parallèle ; retourne latences (s), statuts et durée totale"""
+    target = urlsplit(url)
+    client = _Client(target.hostname, target.port or 80)
+    paths = request_mix(n_requests, seed)
+    latencies = np.zeros(n_requests)
+    statuses = [None] * n_requests
+
+    def send(i):
+        start = time.perf_counter()
+        try:
+            statuses[i] = client.get(paths[i], send_etag)
+        except OSError as e:
+            statuses[i] = type(e).__name__
+        latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(n_requests)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def print_report(latencies, statuses, elapsed):
+    """Affiche le débit, la répartition des statuts et les percentiles de latence"""
+    counts = {}
+    for status in statuses:
+        counts[status] = counts.get(status, 0) + 1
+    errors = sum(n for status, n in counts.items() if not isinstance(status, int) or status >= 400)
+    if not len(statuses):
+        print("Requêtes : aucune")
+        return errors
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+
+    print(f"Requêtes : {len(statuses):,} en {elapsed:.2f} s ({len(statuses) / elapsed:,.0f} req/s)")
+    print("Statuts  : " + ", ".join(f"{status} × {n:,}" for status, n in sorted(counts.items(), key=str)))
+    print(f"Erreurs  : {errors:,}")
+    print(f"Latence  : p50 {p50:.2f} ms | p90 {p90:.2f} ms | p99 {p99:.2f} ms | "
+          f"max {latencies.max() * 1000:.2f} ms")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge du service HTTP des statistiques")
+    parser.add_argument('--url', default=DEFAULT_URL, help="Adresse du service à tester")
+    parser.add_argument('--start', action='store_true',
+                        help="Démarrer un service local (port libre) pour la durée du test")
+    parser.add_argument('--data', default=None, help="Fichier CSV du service démarré avec --start")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--etag', action='store_true',
+                        help="Renvoyer les ETag reçus (If-None-Match) : mesure les réponses 304")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if args.start:
+        from api_server import make_server
+        from data_loading import DATA_PATH
+
+        server = make_server(port=0, path=args.data or DATA_PATH)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+        url = f'http://{host}:{port}'
+        print(f"Service démarré sur {url}")
+
+    try:
+        latencies, statuses, elapsed = run_load_test(url, args.requests, args.concurrency,
+                                                     args.etag, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    errors = print_report(latencies, statuses, elapsed)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
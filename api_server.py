@@ -0,0 +1,308 @@
+"""
+Service HTTP JSON des statistiques de réservations
+
+Les réponses sont calculées sur les données nettoyées partagées
+(shared_dataset), mémorisées par point d'accès et par filtre, et validées par
+ETag : un client qui renvoie l'ETag reçu (If-None-Match) obtient un 304 sans
+corps tant que les données n'ont pas changé.
+
+    python3 api_server.py --port 8000
+    curl 'http://127.0.0.1:8000/stats?hotel=City%20Hotel&year=2016'
+"""
+
+import argparse
+import hashlib
+import ipaddress
+import json
+import math
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from data_analysis import analyze_data
+from data_cube import build_cube, cube_by_hotel, cube_monthly
+from data_loading import DATA_PATH
+from filter_index import FilterIndex
+from section_cache import SectionCache
+from shared_dataset import SharedDataset, open_shared, reload_shared
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_TOP_N = 10
+MAX_TOP_N = 200
+# Taille maximale d'un corps de requête lu (et ignoré) avant de répondre
+MAX_BODY_BYTES = 64 * 1024
+
+# Paramètre d'URL -> dimension de filtrage ; plusieurs valeurs sont séparées
+# par des virgules ou passées en répétant le paramètre
+FILTER_PARAMS = {
+    'hotel': 'hotel',
+    'year': 'arrival_date_year',
+    'month': 'arrival_date_month',
+    'segment': 'market_segment',
+    'deposit': 'deposit_type',
+    'country': 'country',
+}
+INTEGER_DIMENSIONS = {'arrival_date_year'}
+
+
+def parse_filters(query):
+    """Sélection normalisée (triée, hachable) à partir des paramètres d'URL
+
+    Lève ValueError pour un paramètre inconnu ou une année non entière.
+    """
+    params = parse_qs(query, keep_blank_values=False)
+    selection = []
+    for param in sorted(params):
+        if param == 'n':
+            continue
+        if param not in FILTER_PARAMS:
+            raise ValueError(f"paramètre inconnu : {param}")
+        dim = FILTER_PARAMS[param]
+        values = {v.strip() for raw in params[param] for v in raw.split(',') if v.strip()}
+        if dim in INTEGER_DIMENSIONS:
+            try:
+                values = {int(v) for v in values}
+            except ValueError:
+                raise ValueError(f"{param} doit être un entier") from None
+        selection.append((dim, tuple(sorted(values))))
+    return tuple(selection)
+
+
+def _top_n(query):
+    values = parse_qs(query).get('n')
+    if not values:
+        return DEFAULT_TOP_N
+    try:
+        n = int(values[-1])
+    except ValueError:
+        raise ValueError("n doit être un entier") from None
+    if not 1 <= n <= MAX_TOP_N:
+        raise ValueError(f"n doit être compris entre 1 et {MAX_TOP_N}")
+    return n
+
+
+def _jsonable(value):
+    """Convertit les types NumPy en types JSON ; NaN devient null"""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    return value
+
+
+def _ratios_records(frame):
+    return [_jsonable(row) for row in frame.reset_index().to_dict(orient='records')]
+
+
+class LoadedData(NamedTuple):
+    """Jeu partagé et son index de filtrage, remplacés ensemble à chaque rechargement"""
+    generation: int
+    dataset: SharedDataset
+    index: FilterIndex
+
+
+class StatsService:
+    """Réponses JSON des points d'accès, mémorisées par filtre
+
+    Chaque réponse est mémorisée sérialisée, avec son ETag (empreinte du
+    corps) : une requête déjà vue ne coûte qu'une recherche dans le cache.
+    Une requête lit `data` une seule fois ; les clés mémorisées contiennent
+    sa génération, si bien qu'un résultat calculé avant un rechargement
+    n'est jamais servi après.
+    """
+
+    def __init__(self, path=DATA_PATH, cache=None):
+        self.path = path
+        self.cache = cache or SectionCache()
+        self.endpoints = {
+            '/stats': self._stats,
+            '/hotels': self._hotels,
+            '/monthly': self._monthly,
+            '/countries': self._countries,
+        }
+        # Lignes filtrées partagées par les points d'accès d'une même sélection
+        self.cache.configure('bookings', max_entries=4)
+        self._reload_lock = threading.Lock()
+        dataset = open_shared(path)
+        self.data = LoadedData(0, dataset, FilterIndex(dataset.df))
+
+    def reload(self):
+        """Rouvre les données actuelles de la source et vide les réponses mémorisées"""
+        with self._reload_lock:
+            dataset = reload_shared(self.path)
+            self.data = LoadedData(self.data.generation + 1, dataset, FilterIndex(dataset.df))
+            self.cache.clear()
+
+    def bookings(self, data, selection):
+        """Réservations de la sélection (sans copie si aucune ligne n'est exclue)"""
+        return self.cache.get_or_compute(
+            'bookings', (data.generation, selection),
+            lambda: FilterIndex.take(data.dataset.df, data.index.select(**dict(selection))))
+
+    def _stats(self, data, selection, n):
+        return analyze_data(self.bookings(data, selection))
+
+    def _hotels(self, data, selection, n):
+        return _ratios_records(cube_by_hotel(build_cube(self.bookings(data, selection))))
+
+    def _monthly(self, data, selection, n):
+        monthly = cube_monthly(build_cube(self.bookings(data, selection)))
+        return _ratios_records(monthly.sort_values(['arrival_date_year', 'arrival_month_num', 'hotel']))
+
+    def _countries(self, data, selection, n):
+        counts = self.bookings(data, selection)['country'].value_counts()
+        # Les catégories absentes de la sélection sont comptées 0
+        counts = counts[counts > 0].head(n)
+        return [{'country': str(country), 'bookings': int(count)} for country, count in counts.items()]
+
+    def respond(self, endpoint, query):
+        """Corps JSON et ETag de la réponse
+
+        Lève KeyError si le point d'accès n'existe pas, ValueError si les
+        paramètres sont invalides.
+        """
+        handler = self.endpoints[endpoint]
+        data = self.data
+        selection = parse_filters(query)
+        n = _top_n(query) if endpoint == '/countries' else None
+
+        def compute():
+            body = json.dumps({'filters': {dim: list(values) for dim, values in selection},
+                               'data': _jsonable(handler(data, selection, n))},
+                              ensure_ascii=False, allow_nan=False).encode('utf-8')
+            return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+        return self.cache.get_or_compute(endpoint, (data.generation, selection, n), compute)
+
+
+class StatsRequestHandler(BaseHTTPRequestHandler):
+    """GET /stats, /hotels, /monthly, /countries, /health et /cache ; POST /reload"""
+
+    protocol_version = 'HTTP/1.1'
+    # En-têtes et corps sont écrits séparément : sans TCP_NODELAY, chaque
+    # réponse d'une connexion persistante attend l'accusé de réception différé
+    disable_nagle_algorithm = True
+    quiet = True
+
+    def _send(self, status, body=b'', etag=None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        service = self.server.service
+        if url.path == '/health':
+            self._send_json(HTTPStatus.OK, {'status': 'ok', 'rows': len(service.data.dataset.df)})
+            return
+        if url.path == '/cache':
+            self._send_json(HTTPStatus.OK, _jsonable(service.cache.stats()))
+            return
+        try:
+            body, etag = service.respond(url.path, url.query)
+        except KeyError:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f"point d'accès inconnu : {url.path}",
+                                                   'endpoints': sorted(service.endpoints)})
+            return
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+            return
+
+        if_none_match = self.headers.get('If-None-Match', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*':
+            self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+        else:
+            self._send(HTTPStatus.OK, body, etag=etag)
+
+    def _drain_body(self):
+        """Lit le corps de la requête (ignoré) pour garder la connexion utilisable
+
+        Un corps absent de Content-Length, découpé (chunked) ou trop grand
+        n'est pas lu : la connexion est fermée après la réponse.
+        """
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if 'Transfer-Encoding' in self.headers or not 0 <= length <= MAX_BODY_BYTES:
+            self.close_connection = True
+        elif length:
+            self.rfile.read(length)
+
+    def do_POST(self):
+        self._drain_body()
+        if urlsplit(self.path).path != '/reload':
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f"point d'accès inconnu : {self.path}"})
+            return
+        if not (self.server.allow_remote_reload
+                or ipaddress.ip_address(self.client_address[0]).is_loopback):
+            self._send_json(HTTPStatus.FORBIDDEN,
+                            {'error': "/reload n'est accepté que depuis la machine locale "
+                                      "(voir --allow-remote-reload)"})
+            return
+        self.server.service.reload()
+        self._send_json(HTTPStatus.OK, {'status': 'reloaded', 'rows': len(self.server.service.data.dataset.df)})
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, path=DATA_PATH, verbose=False,
+                allow_remote_reload=False):
+    """Serveur multi-threads (un thread par connexion) prêt à servir
+
+    POST /reload n'est accepté que depuis la boucle locale, sauf avec
+    `allow_remote_reload`.
+    """
+    server = ThreadingHTTPServer((host, port), StatsRequestHandler)
+    server.daemon_threads = True
+    server.allow_remote_reload = allow_remote_reload
+    server.service = StatsService(path)
+    StatsRequestHandler.quiet = not verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP JSON des statistiques de réservations")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data', default=DATA_PATH, help="Chemin du fichier CSV des réservations")
+    parser.add_argument('--verbose', action='store_true', help="Journaliser chaque requête")
+    parser.add_argument('--allow-remote-reload', action='store_true',
+                        help="Accepter POST /reload depuis d'autres machines que la machine locale")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.data, args.verbose, args.allow_remote_reload)
+    host, port = server.server_address[:2]
+    print(f"Service disponible sur http://{host}:{port} "
+          f"({len(server.service.data.dataset.df):,} réservations) : {', '.join(sorted(server.service.endpoints))}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
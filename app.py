@@ -1,3 +1,6 @@
+import sys
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -5,6 +8,21 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from chart_summaries import (box_summaries_by_group, histogram_edges, bin_codes,
+                            grouped_histogram)
+from correlation import accumulate_correlation
+from data_cleaning import MONTH_NAMES, MONTH_NUMBERS
+from data_cube import (build_cube, slice_cube, cube_kpis, cube_by_hotel,
+                       cube_monthly, cube_customer_types)
+from filter_index import FilterIndex
+from occupancy import build_calendar
+import profiling
+from profiling import checkpoint
+from section_cache import SectionCache
+from partitioned_store import (ensure_store, read_partition_stats, read_store_summary,
+                               read_partitioned)
+from shared_dataset import open_shared, reload_shared
+
 # Configuration de la page
 st.set_page_config(
     page_title="Analyse des Réservations Hôtelières",
@@ -12,80 +30,329 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Profilage par exécution du script : streamlit run app.py -- --profile
+# (un profileur par exécution, dans le thread de la session)
+PROFILE = '--profile' in sys.argv[1:]
+PROFILE_TRACE = 'output/profile_app.csv'
+if PROFILE:
+    profiling.enable()
+    st.session_state.setdefault('profile_session', uuid.uuid4().hex[:8])
+
 st.title("Analyse Exploratoire de la Demande Hôtelière")
 st.markdown("**City Hotel vs Resort Hotel**")
 st.markdown("---")
 
-# Chargement des données
-@st.cache_data
-def load_data():
-    df = pd.read_csv('data/hotel_bookings.csv')
-    
-    # Nettoyage rapide
-    df_clean = df.copy()
-    df_clean = df_clean.drop_duplicates()
-    df_clean['children'] = df_clean['children'].fillna(0)
-    df_clean['country'] = df_clean['country'].fillna('Unknown')
-    df_clean['agent'] = df_clean['agent'].fillna(0).astype(int)
-    df_clean['company'] = df_clean['company'].fillna(0).astype(int)
-    df_clean['total_stay'] = df_clean['stays_in_weekend_nights'] + df_clean['stays_in_week_nights']
-    df_clean['total_people'] = df_clean['adults'] + df_clean['children'] + df_clean['babies']
-    df_clean = df_clean[df_clean['adr'] >= 0]
-    df_clean = df_clean[df_clean['adr'] < 10000]
-    df_clean = df_clean[df_clean['total_people'] > 0]
-    df_clean = df_clean[df_clean['total_stay'] > 0]
-    
-    return df_clean
+# Jeu de données partitionné (hotel / année) construit à partir du cache des
+# données nettoyées partagé avec main.py
+@st.cache_resource
+def load_store():
+    return ensure_store()
+
+# Cube d'agrégats (résumé statistique des partitions) : les indicateurs et
+# graphiques additifs sont calculés sans lire aucune réservation. Objets
+# partagés tels quels par toutes les sessions (jamais modifiés)
+@st.cache_resource
+def load_cube():
+    return read_partition_stats(load_store())
+
+@st.cache_resource
+def load_store_summary():
+    return read_store_summary(load_store())
+
+# Colonnes lues pour les vues au niveau de la réservation
+APP_COLUMNS = ['hotel', 'is_canceled', 'lead_time', 'arrival_date_year', 'arrival_date_month',
+               'arrival_month_num', 'stays_in_weekend_nights', 'stays_in_week_nights',
+               'adults', 'children', 'babies', 'country', 'market_segment', 'deposit_type',
+               'customer_type', 'adr', 'required_car_parking_spaces',
+               'total_of_special_requests', 'total_stay', 'total_people', 'arrival_date']
+
+# Réservations des seules partitions (hotel, année) et mois sélectionnés, avec
+# leur index de filtrage (codes entiers et bitmaps par valeur), partagées par
+# toutes les sessions. Une tranche couvrant toutes les partitions est une vue
+# sans copie du jeu projeté en mémoire ; une tranche plus étroite ne lit que
+# les fichiers de ses partitions et les colonnes de l'app.
+@st.cache_resource(max_entries=8)
+def load_slice(hotels, years, months):
+    if (set(hotels) >= set(cube['hotel'].unique())
+            and set(years) >= set(cube['arrival_date_year'].unique())
+            and set(months) >= set(cube['arrival_month_num'].unique())):
+        df = open_shared().frame(APP_COLUMNS)
+    else:
+        df = read_partitioned(load_store(), hotels=hotels, years=years, months=months,
+                              columns=APP_COLUMNS)
+    return df, FilterIndex(df)
+
 
-df = load_data()
+def reload_data():
+    """Relit les données après une modification du fichier source (ou du nettoyage)"""
+    reload_shared()
+    for loader in (load_store, load_cube, load_store_summary, load_slice, load_histogram_bins):
+        loader.clear()
+    memo.clear()
 
+checkpoint("Chargement")
+cube = load_cube()
+store_summary = load_store_summary()
+dimension_values = store_summary['values']
+
+checkpoint("Filtres")
 st.sidebar.header("Filtres")
 
 # Filtre par type d'hôtel
 hotel_types = st.sidebar.multiselect(
     "Type d'hôtel",
-    options=df['hotel'].unique(),
-    default=df['hotel'].unique()
+    options=cube['hotel'].unique(),
+    default=cube['hotel'].unique()
 )
 
 # Filtre par année
 years = st.sidebar.multiselect(
     "Année",
-    options=sorted(df['arrival_date_year'].unique()),
-    default=sorted(df['arrival_date_year'].unique())
+    options=sorted(cube['arrival_date_year'].unique()),
+    default=sorted(cube['arrival_date_year'].unique())
 )
 
 # Filtre par mois
+month_options = [MONTH_NAMES[m - 1] for m in sorted(cube['arrival_month_num'].unique())]
 months = st.sidebar.multiselect(
     "Mois",
-    options=sorted(df['arrival_date_month'].unique()),
-    default=sorted(df['arrival_date_month'].unique())
+    options=month_options,
+    default=month_options
 )
 
-# Application des filtres
-df_filtered = df[
-    (df['hotel'].isin(hotel_types)) &
-    (df['arrival_date_year'].isin(years)) &
-    (df['arrival_date_month'].isin(months))
-]
+# Filtres avancés (dimensions absentes du cube)
+with st.sidebar.expander("Filtres avancés"):
+    market_segments = st.multiselect(
+        "Segment de marché",
+        options=dimension_values['market_segment'],
+        default=dimension_values['market_segment']
+    )
+    deposit_types = st.multiselect(
+        "Type de dépôt",
+        options=dimension_values['deposit_type'],
+        default=dimension_values['deposit_type']
+    )
+    countries = st.multiselect(
+        "Pays",
+        options=dimension_values['country'],
+        default=[],
+        help="Aucune sélection : tous les pays"
+    )
+
+filters = {
+    'hotel': hotel_types,
+    'arrival_date_year': years,
+    'arrival_date_month': months,
+    'market_segment': market_segments,
+    'deposit_type': deposit_types,
+    'country': countries or None,
+}
+
+def normalize_selection(filters):
+    """Clé normalisée d'une sélection : valeurs triées, types Python natifs
+
+    Deux sélections des mêmes valeurs (dans n'importe quel ordre) ont la même
+    clé ; dict(clé) redonne des filtres utilisables par FilterIndex.select.
+    """
+    key = []
+    for dim, values in filters.items():
+        if values is not None:
+            values = tuple(sorted(int(v) if isinstance(v, (int, np.integer)) else str(v)
+                                  for v in values))
+        key.append((dim, values))
+    return tuple(key)
+
+
+def slice_key_of(selection_key):
+    """Partitions et mois lus pour une sélection (filtres poussés à la lecture)"""
+    selection = dict(selection_key)
+    return (selection['hotel'], selection['arrival_date_year'],
+            tuple(sorted(MONTH_NUMBERS[m] for m in selection['arrival_date_month'])))
+
+
+# Clé normalisée de la sélection, utilisée pour mémoriser les calculs par section
+selection_key = normalize_selection(filters)
+
+
+# Résultats des sections mémorisés par sélection, partagés entre exécutions
+# et sessions (LRU borné par section, expiration après 10 minutes)
+@st.cache_resource
+def section_cache():
+    return SectionCache()
+
+memo = section_cache()
+
+NUMERIC_COLUMNS = ['is_canceled', 'lead_time', 'arrival_date_year', 
+                   'stays_in_weekend_nights', 'stays_in_week_nights', 
+                   'adults', 'children', 'babies', 'adr', 
+                   'required_car_parking_spaces', 'total_of_special_requests',
+                   'total_stay', 'total_people']
+
+
+HOTEL_COLORS = {'City Hotel': '#3498db', 'Resort Hotel': '#e74c3c'}
+
+
+def add_box_traces(fig, summaries, row, col, showlegend=True):
+    """Boîtes à moustaches tracées à partir des résumés précalculés"""
+    for hotel, color in HOTEL_COLORS.items():
+        summary = summaries.get(hotel)
+        if summary is None:
+            continue
+        fig.add_trace(go.Box(
+            x=[hotel], name=hotel, marker_color=color, showlegend=showlegend,
+            q1=[summary['q1']], median=[summary['median']], q3=[summary['q3']],
+            lowerfence=[summary['lowerfence']], upperfence=[summary['upperfence']]
+        ), row=row, col=col)
+        if summary['outliers']:
+            fig.add_trace(go.Scatter(
+                x=[hotel] * len(summary['outliers']), y=summary['outliers'], mode='markers',
+                marker=dict(color=color, size=4), showlegend=False, hoverinfo='y'
+            ), row=row, col=col)
+
+
+# Classes fixes des histogrammes : le numéro de classe de chaque réservation
+# est calculé une seule fois, les effectifs d'une sélection s'obtiennent par bincount
+@st.cache_resource(max_entries=8)
+def load_histogram_bins(slice_key):
+    df, _ = load_slice(*slice_key)
+    hotel_codes, hotels = pd.factorize(df['hotel'], sort=True)
+    bins = {'hotel_codes': hotel_codes, 'hotels': [str(h) for h in hotels]}
+    lead_time_max = store_summary['ranges']['lead_time'][1]
+    for column, upper in (('adr', 500), ('lead_time', lead_time_max + 1)):
+        edges = histogram_edges(upper, bins=50)
+        bins[column] = {'edges': edges, 'codes': bin_codes(df[column], edges)}
+    return bins
+
+
+def histogram_figure(histogram, x_label, title):
+    """Histogramme superposé par hôtel tracé en barres à partir des effectifs"""
+    edges = histogram['edges']
+    fig = go.Figure()
+    for hotel, color in HOTEL_COLORS.items():
+        counts = histogram['counts'].get(hotel)
+        if counts is None or not counts.any():
+            continue
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+            name=hotel, marker_color=color, opacity=0.7
+        ))
+    fig.update_layout(
+        height=500, font=dict(size=12), title=title, barmode='overlay', bargap=0,
+        xaxis_title=x_label, yaxis_title='Nombre de réservations', legend_title_text='hotel'
+    )
+    return fig
+
+
+# Calculs de chaque section : fonctions pures de la sélection normalisée,
+# mémorisées dans le cache des sections. Changer les graphiques affichés ou
+# revenir à une sélection déjà vue ne relance aucun calcul.
+ADVANCED_DIMENSIONS = ('market_segment', 'deposit_type', 'country')
+
+
+@memo.memoize("Réservations filtrées", max_entries=4)
+def filtered_bookings(selection_key):
+    """Réservations de la sélection, résolues par l'index de la tranche lue"""
+    df, index = load_slice(*slice_key_of(selection_key))
+    return FilterIndex.take(df, index.select(**dict(selection_key)))
+
+
+@memo.memoize("Cube filtré")
+def selection_cube(selection_key):
+    """Cellules du cube de la sélection
+
+    Le cube répond tant que seules ses dimensions sont filtrées, sinon les
+    agrégats sont recalculés sur les réservations retenues.
+    """
+    selection = dict(selection_key)
+    if any(selection[dim] is not None and not set(selection[dim]).issuperset(dimension_values[dim])
+           for dim in ADVANCED_DIMENSIONS):
+        return build_cube(filtered_bookings(selection_key))
+    return slice_cube(cube, selection['hotel'], selection['arrival_date_year'],
+                      selection['arrival_date_month'])
+
+
+@memo.memoize("Indicateurs")
+def selection_kpis(selection_key):
+    return cube_kpis(selection_cube(selection_key))
+
+
+@memo.memoize("Comparaison City vs Resort")
+def comparison_data(selection_key):
+    """Taux et moyennes par hôtel (cube) et résumés de boîtes à moustaches (lignes)"""
+    by_hotel = cube_by_hotel(selection_cube(selection_key))
+    df_filtered = filtered_bookings(selection_key)
+    return {
+        'cancel_by_hotel': by_hotel['cancellation_rate'] * 100,
+        'stay_by_hotel': by_hotel['avg_stay'],
+        'adr_boxes': box_summaries_by_group(df_filtered, 'adr'),
+        'lead_time_boxes': box_summaries_by_group(df_filtered, 'lead_time'),
+    }
+
+
+@memo.memoize("Évolution temporelle")
+def monthly_bookings(selection_key):
+    df_monthly = cube_monthly(selection_cube(selection_key))
+    df_monthly['month_year'] = df_monthly['arrival_date_year'].astype(str) + '-' + df_monthly['arrival_month_num'].astype(str).str.zfill(2)
+    return df_monthly.sort_values(['arrival_date_year', 'arrival_month_num'])
+
+
+# Effectifs par hôtel et par classe (colonne 'adr' ou 'lead_time')
+@memo.memoize("Histogrammes")
+def histogram_counts(selection_key, column):
+    slice_key = slice_key_of(selection_key)
+    bins = load_histogram_bins(slice_key)
+    _, index = load_slice(*slice_key)
+    rows = index.select(**dict(selection_key))
+    edges = bins[column]['edges']
+    counts = grouped_histogram(bins['hotel_codes'][rows], bins[column]['codes'][rows],
+                               len(bins['hotels']), len(edges) - 1)
+    return {'edges': edges, 'counts': dict(zip(bins['hotels'], counts))}
+
+
+@memo.memoize("Types de clients")
+def customer_types(selection_key):
+    return cube_customer_types(selection_cube(selection_key))
+
+
+# Matrice calculée à partir de l'accumulateur (n, Σx, XᵀX) des lignes retenues
+@memo.memoize("Matrice de corrélation")
+def correlation_matrix(selection_key):
+    return accumulate_correlation(filtered_bookings(selection_key), NUMERIC_COLUMNS).corr()
+
+
+@memo.memoize("Top pays")
+def top_countries(selection_key):
+    counts = filtered_bookings(selection_key)['country'].value_counts()
+    # Les catégories absentes de la sélection sont comptées 0
+    return counts[counts > 0].head(10)
+
+
+# Chambres occupées et revenu par nuit (calendrier par tableaux de différences)
+@memo.memoize("Occupation par nuit")
+def nightly_occupancy(selection_key):
+    return build_calendar(filtered_bookings(selection_key)).daily()
+
+
+checkpoint("Indicateurs")
+kpis = selection_kpis(selection_key)
 
 st.header("Statistiques Principales")
 
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Total Réservations", f"{len(df_filtered):,}")
+    st.metric("Total Réservations", f"{kpis['total_bookings']:,}")
 
 with col2:
-    cancellation_rate = (df_filtered['is_canceled'].mean() * 100)
+    cancellation_rate = (kpis['cancellation_rate'] * 100)
     st.metric("Taux d'annulation", f"{cancellation_rate:.2f}%")
 
 with col3:
-    avg_adr = df_filtered['adr'].mean()
+    avg_adr = kpis['avg_adr']
     st.metric("Prix moyen (ADR)", f"${avg_adr:.2f}")
 
 with col4:
-    avg_stay = df_filtered['total_stay'].mean()
+    avg_stay = kpis['avg_stay']
     st.metric("Durée moyenne séjour", f"{avg_stay:.1f} nuits")
 
 st.markdown("---")
@@ -100,7 +367,8 @@ visualizations = st.sidebar.multiselect(
         "Lead Time",
         "Types de clients",
         "Matrice de corrélation",
-        "Top pays"
+        "Top pays",
+        "Occupation par nuit"
     ],
     default=[
         "Comparaison City vs Resort",
@@ -110,6 +378,7 @@ visualizations = st.sidebar.multiselect(
 )
 
 if "Comparaison City vs Resort" in visualizations:
+    checkpoint("Comparaison City vs Resort")
     st.header("Comparaison City Hotel vs Resort Hotel")
     
     fig = make_subplots(
@@ -120,8 +389,10 @@ if "Comparaison City vs Resort" in visualizations:
                [{"type": "bar"}, {"type": "box"}]]
     )
     
+    comparison = comparison_data(selection_key)
+    
     # Taux d'annulation
-    cancel_by_hotel = df_filtered.groupby('hotel')['is_canceled'].mean() * 100
+    cancel_by_hotel = comparison['cancel_by_hotel']
     fig.add_trace(
         go.Bar(x=cancel_by_hotel.index, y=cancel_by_hotel.values,
                marker_color=['#3498db', '#e74c3c'], showlegend=False),
@@ -129,15 +400,10 @@ if "Comparaison City vs Resort" in visualizations:
     )
     
     # Prix (ADR)
-    city_adr = df_filtered[df_filtered['hotel'] == 'City Hotel']['adr']
-    resort_adr = df_filtered[df_filtered['hotel'] == 'Resort Hotel']['adr']
-    if len(city_adr) > 0:
-        fig.add_trace(go.Box(y=city_adr, name='City Hotel', marker_color='#3498db'), row=1, col=2)
-    if len(resort_adr) > 0:
-        fig.add_trace(go.Box(y=resort_adr, name='Resort Hotel', marker_color='#e74c3c'), row=1, col=2)
+    add_box_traces(fig, comparison['adr_boxes'], row=1, col=2)
     
     # Durée de séjour
-    stay_by_hotel = df_filtered.groupby('hotel')['total_stay'].mean()
+    stay_by_hotel = comparison['stay_by_hotel']
     fig.add_trace(
         go.Bar(x=stay_by_hotel.index, y=stay_by_hotel.values,
                marker_color=['#3498db', '#e74c3c'], showlegend=False),
@@ -145,12 +411,8 @@ if "Comparaison City vs Resort" in visualizations:
     )
     
     # Lead Time
-    city_lead = df_filtered[df_filtered['hotel'] == 'City Hotel']['lead_time']
-    resort_lead = df_filtered[df_filtered['hotel'] == 'Resort Hotel']['lead_time']
-    if len(city_lead) > 0:
-        fig.add_trace(go.Box(y=city_lead, name='City Hotel', marker_color='#3498db', showlegend=False), row=2, col=2)
-    if len(resort_lead) > 0:
-        fig.add_trace(go.Box(y=resort_lead, name='Resort Hotel', marker_color='#e74c3c', showlegend=False), row=2, col=2)
+    add_box_traces(fig, comparison['lead_time_boxes'], row=2, col=2,
+                   showlegend=False)
     
     fig.update_layout(
         height=800,
@@ -170,12 +432,10 @@ if "Comparaison City vs Resort" in visualizations:
     st.markdown("---")
 
 if "Évolution temporelle" in visualizations:
+    checkpoint("Évolution temporelle")
     st.header("Évolution Temporelle des Réservations")
     
-    df_filtered['arrival_date_month_num'] = pd.to_datetime(df_filtered['arrival_date_month'], format='%B').dt.month
-    df_monthly = df_filtered.groupby(['arrival_date_year', 'arrival_date_month_num', 'hotel']).size().reset_index(name='count')
-    df_monthly['month_year'] = df_monthly['arrival_date_year'].astype(str) + '-' + df_monthly['arrival_date_month_num'].astype(str).str.zfill(2)
-    df_monthly = df_monthly.sort_values(['arrival_date_year', 'arrival_date_month_num'])
+    df_monthly = monthly_bookings(selection_key)
     
     fig = px.line(
         df_monthly,
@@ -198,46 +458,34 @@ if "Évolution temporelle" in visualizations:
     st.markdown("---")
 
 if "Distribution des prix" in visualizations:
+    checkpoint("Distribution des prix")
     st.header("Distribution des Prix (ADR)")
     
-    df_price = df_filtered[df_filtered['adr'] < 500]
-    fig = px.histogram(
-        df_price,
-        x='adr',
-        nbins=50,
-        color='hotel',
-        color_discrete_map={'City Hotel': '#3498db', 'Resort Hotel': '#e74c3c'},
-        labels={'adr': 'Prix moyen journalier (ADR)', 'count': 'Nombre de réservations'},
-        title='Distribution des prix par type d\'hôtel',
-        opacity=0.7,
-        barmode='overlay'
+    fig = histogram_figure(
+        histogram_counts(selection_key, 'adr'),
+        x_label='Prix moyen journalier (ADR)',
+        title='Distribution des prix par type d\'hôtel'
     )
-    fig.update_layout(height=500, font=dict(size=12))
     st.plotly_chart(fig, use_container_width=True)
     st.markdown("---")
 
 if "Lead Time" in visualizations:
+    checkpoint("Lead Time")
     st.header("Analyse du Lead Time")
     
-    fig = px.histogram(
-        df_filtered,
-        x='lead_time',
-        color='hotel',
-        nbins=50,
-        color_discrete_map={'City Hotel': '#3498db', 'Resort Hotel': '#e74c3c'},
-        labels={'lead_time': 'Lead Time (jours)', 'count': 'Nombre de réservations'},
-        title='Distribution du Lead Time par type d\'hôtel',
-        opacity=0.7,
-        barmode='overlay'
+    fig = histogram_figure(
+        histogram_counts(selection_key, 'lead_time'),
+        x_label='Lead Time (jours)',
+        title='Distribution du Lead Time par type d\'hôtel'
     )
-    fig.update_layout(height=500, font=dict(size=12))
     st.plotly_chart(fig, use_container_width=True)
     st.markdown("---")
 
 if "Types de clients" in visualizations:
+    checkpoint("Types de clients")
     st.header("Répartition des Types de Clients")
     
-    customer_type_counts = pd.crosstab(df_filtered['hotel'], df_filtered['customer_type'])
+    customer_type_counts = customer_types(selection_key)
     fig = px.bar(
         customer_type_counts.reset_index(),
         x='hotel',
@@ -252,15 +500,10 @@ if "Types de clients" in visualizations:
     st.markdown("---")
 
 if "Matrice de corrélation" in visualizations:
+    checkpoint("Matrice de corrélation")
     st.header("Matrice de Corrélation")
     
-    numeric_cols = ['is_canceled', 'lead_time', 'arrival_date_year', 
-                    'stays_in_weekend_nights', 'stays_in_week_nights', 
-                    'adults', 'children', 'babies', 'adr', 
-                    'required_car_parking_spaces', 'total_of_special_requests',
-                    'total_stay', 'total_people']
-    
-    correlation_df = df_filtered[numeric_cols].corr()
+    correlation_df = correlation_matrix(selection_key)
     
     fig = px.imshow(
         correlation_df,
@@ -276,24 +519,84 @@ if "Matrice de corrélation" in visualizations:
     st.markdown("---")
 
 if "Top pays" in visualizations:
+    checkpoint("Top pays")
     st.header("Top 10 des Pays d'Origine")
     
-    top_countries = df_filtered['country'].value_counts().head(10)
+    countries_top = top_countries(selection_key)
     fig = px.bar(
-        x=top_countries.values,
-        y=top_countries.index,
+        x=countries_top.values,
+        y=countries_top.index,
         orientation='h',
         labels={'x': 'Nombre de réservations', 'y': 'Pays'},
         title='Top 10 des pays d\'origine des clients',
-        color=top_countries.values,
+        color=countries_top.values,
         color_continuous_scale='Viridis'
     )
     fig.update_layout(height=500, font=dict(size=12), showlegend=False)
     st.plotly_chart(fig, use_container_width=True)
     st.markdown("---")
 
+if "Occupation par nuit" in visualizations:
+    checkpoint("Occupation par nuit")
+    st.header("Occupation et Revenu par Nuit")
+    st.caption("Réservations non annulées de la sélection (filtrées par date d'arrivée), "
+               "réparties sur chacune des nuits de leur séjour")
+
+    daily = nightly_occupancy(selection_key)
+    if daily.empty:
+        st.info("Aucun séjour dans la sélection")
+    else:
+        col1, col2, col3 = st.columns(3)
+        nights_by_date = daily.groupby('date')['room_nights'].sum()
+        with col1:
+            st.metric("Nuitées", f"{int(daily['room_nights'].sum()):,}")
+        with col2:
+            st.metric("Pic de chambres occupées", f"{int(nights_by_date.max()):,}",
+                      help=f"Nuit du {nights_by_date.idxmax():%d/%m/%Y}")
+        with col3:
+            st.metric("Revenu des séjours", f"${daily['revenue'].sum():,.0f}")
+
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                            subplot_titles=('Chambres occupées par nuit', 'Revenu par nuit'))
+        colors = {'City Hotel': '#3498db', 'Resort Hotel': '#e74c3c'}
+        for hotel, hotel_daily in daily.groupby('hotel', observed=True):
+            fig.add_trace(go.Scatter(x=hotel_daily['date'], y=hotel_daily['room_nights'], name=hotel,
+                                     mode='lines', line=dict(color=colors.get(hotel)), legendgroup=hotel),
+                          row=1, col=1)
+            fig.add_trace(go.Scatter(x=hotel_daily['date'], y=hotel_daily['revenue'], name=hotel,
+                                     mode='lines', line=dict(color=colors.get(hotel)), legendgroup=hotel,
+                                     showlegend=False),
+                          row=2, col=1)
+        fig.update_yaxes(title_text="Chambres", row=1, col=1)
+        fig.update_yaxes(title_text="Revenu ($)", row=2, col=1)
+        fig.update_layout(height=700, font=dict(size=12))
+        st.plotly_chart(fig, use_container_width=True)
+    st.markdown("---")
+
 # Footer
 st.markdown("---")
 st.markdown("**Projet :** 8PRO408 - Outils de programmation pour la science des données")
 st.markdown("**Dataset :** Hotel Booking Demand (Kaggle)")
 
+# Rechargement explicite quand le fichier source change
+st.sidebar.header("Données")
+if st.sidebar.button("Recharger les données"):
+    reload_data()
+    st.rerun()
+
+# Compteurs du cache des sections (succès, échecs, évictions) pour le débogage
+with st.sidebar.expander("Débogage : cache des calculs"):
+    cache_stats = pd.DataFrame(memo.stats())
+    if not cache_stats.empty:
+        st.dataframe(cache_stats.round(3), hide_index=True)
+    if st.button("Vider le cache des calculs"):
+        memo.clear()
+
+if PROFILE:
+    profiler = profiling.disable()
+    profiler.write_csv(PROFILE_TRACE, append=True,
+                       extra={'session': st.session_state['profile_session'],
+                              'rerun': pd.Timestamp.now().isoformat(timespec='milliseconds')})
+    with st.sidebar.expander("Profilage de l'exécution", expanded=True):
+        st.dataframe(pd.DataFrame(profiler.sorted_records())[
+            ['name', 'wall_s', 'cpu_s', 'tracemalloc_peak_mb']].round(3), hide_index=True)
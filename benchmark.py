@@ -0,0 +1,229 @@
+"""
+Banc d'essai des étapes du pipeline sur des données synthétiques
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+from profiling import Profiler
+from synthetic_data import DEFAULT_SEED, format_size, parse_size, write_synthetic_csv
+
+BENCH_DIR = 'benchmarks'
+SIZES = ['100k', '1M', '10M', '50M']
+
+# Étapes mesurées, dans l'ordre d'exécution du pipeline
+STAGES = ['load', 'clean', 'analyze', 'visualize', 'cache_write', 'app_prep', 'rapport']
+# Étapes qui travaillent sur les données nettoyées en mémoire
+NEEDS_CLEAN = {'analyze', 'visualize', 'cache_write'}
+
+# Écart relatif au-delà duquel une mesure est signalée comme régression
+DEFAULT_TOLERANCE = 0.10
+# Durée en dessous de laquelle un écart de temps n'est pas significatif
+MIN_SECONDS = 0.05
+
+
+def _run_stages(stages, workers, trace_memory):
+    """Exécute les étapes dans le répertoire courant et mesure chacune d'elles
+
+    Avec `trace_memory`, tracemalloc est actif et mesure le pic
+    d'allocations de chaque étape, au prix d'un ralentissement des
+    allocations : les temps de cette exécution ne sont pas représentatifs.
+    """
+    from data_analysis import analyze_data, visualize_data
+    from data_cache import write_cache
+    from data_cleaning import clean_data
+    from data_loading import load_data
+    from filter_index import FilterIndex
+    from generate_rapport import generate_rapport
+    from memory_budget import optimize_memory
+    from partitioned_store import ensure_store, read_partition_stats, read_store_summary
+    from shared_dataset import open_shared
+
+    def app_prep(context):
+        root = ensure_store()
+        read_partition_stats(root)
+        read_store_summary(root)
+        FilterIndex(open_shared().df)
+
+    def cache_write(context):
+        # Types minimaux, comme le cache écrit par data_cache.load_clean_data et main.py
+        _, footprint = optimize_memory(context['df'], inplace=True)
+        write_cache(context['df'], footprint=footprint)
+
+    actions = {
+        'load': lambda context: context.update(raw=load_data()),
+        'clean': lambda context: context.update(df=clean_data(context.pop('raw'), inplace=True)),
+        'analyze': lambda context: analyze_data(context['df']),
+        'visualize': lambda context: visualize_data(context['df'], n_workers=workers),
+        'cache_write': cache_write,
+        'app_prep': app_prep,
+        'rapport': lambda context: generate_rapport(),
+    }
+
+    context = {}
+    profiler = Profiler(trace_memory=trace_memory).start()
+    for stage in stages:
+        with profiler.span(stage):
+            actions[stage](context)
+    profiler.stop()
+    return [{'stage': r['name'], 'seconds': r['wall_s'], 'cpu_seconds': r['cpu_s'],
+             'tracemalloc_peak_mb': r['tracemalloc_peak_mb'], 'rss_peak_mb': r['rss_peak_mb']}
+            for r in profiler.sorted_records()]
+
+
+def run_size(n_rows, stages, seed=DEFAULT_SEED, workdir=BENCH_DIR, workers=1):
+    """Mesure les étapes pour un jeu synthétique de `n_rows` lignes
+
+    Chaque taille dispose de son répertoire de travail (données, cache,
+    graphiques et rapport) : les chemins relatifs du projet y sont utilisés
+    tels quels. Les étapes sont exécutées deux fois, cache vidé avant
+    chacune (mesures à froid) : d'abord sans tracemalloc pour les temps et
+    le pic de mémoire résidente, puis avec pour les pics d'allocations
+    Python. Appelée dans un processus dédié, pour que le pic de mémoire
+    résidente ne dépende que de cette taille.
+    """
+    root = os.path.join(workdir, f"{format_size(n_rows)}_seed{seed}")
+    data_path = os.path.join(root, 'data', 'hotel_bookings.csv')
+    if not os.path.exists(data_path):
+        write_synthetic_csv(data_path, n_rows, seed=seed)
+
+    os.makedirs(os.path.join(root, 'output'), exist_ok=True)
+    os.chdir(root)
+
+    shutil.rmtree('cache', ignore_errors=True)
+    measures = _run_stages(stages, workers, trace_memory=False)
+    shutil.rmtree('cache', ignore_errors=True)
+    traced = _run_stages(stages, workers, trace_memory=True)
+    for measure, traced_measure in zip(measures, traced):
+        measure['tracemalloc_peak_mb'] = traced_measure['tracemalloc_peak_mb']
+        measure['rows'] = n_rows
+        measure['rows_per_second'] = n_rows / measure['seconds'] if measure['seconds'] else None
+    return measures
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _metadata(seed, workers):
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': {'numpy': np.__version__, 'pandas': pd.__version__,
+                     'pyarrow': pa.__version__},
+        'seed': seed,
+        'workers': workers,
+    }
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compare deux fichiers de résultats ; retourne les mesures en régression"""
+    previous = {(r['rows'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'Taille':>8} {'Étape':<12} {'Temps':>10} {'Rapport':>8} {'Pic Python':>11} {'Rapport':>8}")
+    for result in results['results']:
+        before = previous.get((result['rows'], result['stage']))
+        if before is None:
+            continue
+        time_ratio = result['seconds'] / before['seconds'] if before['seconds'] else float('nan')
+        memory_ratio = (result['tracemalloc_peak_mb'] / before['tracemalloc_peak_mb']
+                        if before['tracemalloc_peak_mb'] else float('nan'))
+        flag = ''
+        slower = time_ratio > 1 + tolerance and result['seconds'] >= MIN_SECONDS
+        if slower or memory_ratio > 1 + tolerance:
+            regressions.append(result)
+            flag = '  <- régression'
+        print(f"{format_size(result['rows']):>8} {result['stage']:<12} "
+              f"{result['seconds']:>9.2f}s {time_ratio:>7.2f}x "
+              f"{result['tracemalloc_peak_mb']:>9.1f}Mo {memory_ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai du pipeline sur données synthétiques")
+    parser.add_argument('--sizes', nargs='+', default=SIZES,
+                        help="Tailles des jeux synthétiques (ex. 100k 1M 10M 50M)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help="Étapes à mesurer")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="Graine du générateur de données")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour le rendu des graphiques")
+    parser.add_argument('--workdir', default=BENCH_DIR,
+                        help="Répertoire des données et résultats du banc d'essai")
+    parser.add_argument('--output', default=None,
+                        help="Fichier JSON des résultats (défaut : <workdir>/results_<date>.json)")
+    parser.add_argument('--compare', default=None,
+                        help="Fichier de résultats de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Écart relatif toléré avant de signaler une régression")
+    args = parser.parse_args(argv)
+
+    stages = [stage for stage in STAGES if stage in args.stages]
+    if 'clean' in stages and 'load' not in stages:
+        parser.error("l'étape clean nécessite l'étape load")
+    if NEEDS_CLEAN.intersection(stages) and 'clean' not in stages:
+        parser.error("les étapes " + ', '.join(sorted(NEEDS_CLEAN.intersection(stages)))
+                     + " nécessitent l'étape clean")
+    args.stages = stages
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = os.path.abspath(args.workdir)
+    sizes = [parse_size(size) for size in args.sizes]
+
+    results = {'meta': _metadata(args.seed, args.workers), 'results': []}
+    context = get_context('spawn')
+    for n_rows in sizes:
+        print(f"Banc d'essai : {n_rows:,} lignes...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            measures = executor.submit(run_size, n_rows, args.stages, args.seed,
+                                       workdir, args.workers).result()
+        for measure in measures:
+            print(f"   • {measure['stage']:<12} {measure['seconds']:>8.2f}s  "
+                  f"pic Python {measure['tracemalloc_peak_mb']:>8.1f} Mo")
+        results['results'].extend(measures)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(workdir, f"results_{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Résultats enregistrés dans {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} mesure(s) en régression")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+"""
+Modèle de risque d'annulation (régression logistique NumPy) et notation par lots
+
+    python3 cancellation_model.py train
+    python3 cancellation_model.py score data/nouvelles_reservations.csv --output output/scores.csv --workers 4
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from data_cleaning import MONTH_NAMES, UNKNOWN_COUNTRY
+from data_loading import DATA_PATH, DEFAULT_CHUNKSIZE, read_csv_kwargs
+
+MODEL_PATH = 'output/cancellation_model.json'
+SCORE_COLUMN = 'cancellation_risk'
+# Position de la réservation dans le fichier noté (0 : première ligne de données)
+ROW_COLUMN = 'row'
+
+# Variables connues à la réservation : le statut final, la date de statut et
+# la chambre attribuée (connue à l'arrivée) sont exclus
+NUMERIC_FEATURES = [
+    'lead_time', 'stays_in_weekend_nights', 'stays_in_week_nights', 'adults', 'children',
+    'babies', 'is_repeated_guest', 'previous_cancellations', 'previous_bookings_not_canceled',
+    'booking_changes', 'days_in_waiting_list', 'adr', 'required_car_parking_spaces',
+    'total_of_special_requests',
+]
+# Variables à forte asymétrie, transformées par log(1 + x)
+LOG_FEATURES = {'lead_time', 'previous_cancellations', 'previous_bookings_not_canceled',
+                'days_in_waiting_list', 'adr'}
+# Indicateurs de présence (intermédiaire, entreprise)
+PRESENCE_FEATURES = ['agent', 'company']
+# Variables catégorielles encodées en indicateurs ; le mois porte la saisonnalité
+CATEGORICAL_FEATURES = ['hotel', 'arrival_date_month', 'deposit_type', 'market_segment',
+                        'distribution_channel', 'customer_type', 'meal', 'country']
+# Seuls les pays les plus fréquents ont leur propre indicateur
+TOP_COUNTRIES = 30
+# Valeurs manquantes remplacées comme au nettoyage (données d'entraînement)
+MISSING_CATEGORIES = {'country': UNKNOWN_COUNTRY}
+
+MODEL_COLUMNS = NUMERIC_FEATURES + PRESENCE_FEATURES + CATEGORICAL_FEATURES
+TARGET = 'is_canceled'
+
+DEFAULT_L2 = 1.0
+MAX_ITERATIONS = 25
+TOLERANCE = 1e-6
+HOLDOUT_FRACTION = 0.2
+DEFAULT_SEED = 42
+# Lignes par bloc de la matrice des variables à l'entraînement (~90 variables :
+# environ 36 Mo par bloc, quelle que soit la taille du jeu)
+TRAIN_BLOCK_ROWS = 50_000
+
+
+def _numeric_values(df, col):
+    """Valeurs float64 d'une variable numérique ; manquantes à 0, log(1 + x) si asymétrique"""
+    values = df[col].to_numpy(dtype=np.float64, na_value=0.0)
+    if col in LOG_FEATURES:
+        values = np.log1p(np.maximum(values, 0.0))
+    return values
+
+
+def _category_codes(df, col, vocabulary):
+    """Position de chaque valeur dans le vocabulaire, -1 si absente
+
+    Sur une colonne catégorielle, seules les catégories sont recodées. Une
+    valeur manquante est codée comme sa valeur de remplacement au nettoyage
+    (MISSING_CATEGORIES) : une réservation brute et la même réservation
+    nettoyée ont le même encodage. Les valeurs inconnues n'activent aucun
+    indicateur.
+    """
+    codes = pd.Categorical(df[col], categories=vocabulary).codes
+    fill = MISSING_CATEGORIES.get(col)
+    if fill in vocabulary:
+        codes = np.where(df[col].isna().to_numpy(), vocabulary.index(fill), codes)
+    return codes
+
+
+def _sigmoid(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def auc_score(y, scores):
+    """Aire sous la courbe ROC (rangs, ex aequo moyennés)"""
+    ranks = pd.Series(scores).rank().to_numpy()
+    n_pos = int(y.sum())
+    n_neg = len(y) - n_pos
+    if not n_pos or not n_neg:
+        return float('nan')
+    return float((ranks[y == 1].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+class CancellationModel:
+    """Régression logistique sur variables standardisées et indicateurs
+
+    L'entraînement construit la matrice des variables bloc par bloc ; la
+    notation n'en a pas besoin : le logit est la somme, variable par
+    variable, d'un produit (numériques) ou d'une lecture du poids de la
+    modalité (catégorielles).
+    """
+
+    def __init__(self, means, stds, vocabularies, bias, weights, metrics=None):
+        self.means = means
+        self.stds = stds
+        self.vocabularies = vocabularies
+        self.bias = bias
+        self.weights = weights
+        self.metrics = metrics or {}
+
+    @property
+    def feature_names(self):
+        names = list(NUMERIC_FEATURES) + [f'{col}>0' for col in PRESENCE_FEATURES]
+        for col in CATEGORICAL_FEATURES:
+            names += [f'{col}={value}' for value in self.vocabularies[col]]
+        return names
+
+    @classmethod
+    def _fit_encoding(cls, df):
+        """Moyennes, écarts-types et vocabulaires appris sur les données d'entraînement"""
+        means, stds = {}, {}
+        for col in NUMERIC_FEATURES:
+            values = _numeric_values(df, col)
+            means[col] = float(values.mean())
+            stds[col] = float(values.std()) or 1.0
+        vocabularies = {}
+        for col in CATEGORICAL_FEATURES:
+            counts = df[col].value_counts()
+            counts = counts[counts > 0]
+            if col == 'country':
+                counts = counts.head(TOP_COUNTRIES)
+            elif col == 'arrival_date_month':
+                counts = counts.reindex([m for m in MONTH_NAMES if m in counts.index])
+            vocabularies[col] = [str(value) for value in counts.index]
+        return means, stds, vocabularies
+
+    def design_matrix(self, df, intercept=False):
+        """Matrice (n × variables) en float64, construite colonne par colonne
+
+        Avec `intercept`, la première colonne vaut 1 (ordonnée à l'origine).
+        """
+        X = np.zeros((len(df), int(intercept) + len(self.weights)))
+        if intercept:
+            X[:, 0] = 1.0
+        j = int(intercept)
+        for col in NUMERIC_FEATURES:
+            X[:, j] = (_numeric_values(df, col) - self.means[col]) / self.stds[col]
+            j += 1
+        for col in PRESENCE_FEATURES:
+            X[:, j] = df[col].to_numpy(dtype=np.float64, na_value=0.0) > 0
+            j += 1
+        for col in CATEGORICAL_FEATURES:
+            codes = _category_codes(df, col, self.vocabularies[col])
+            rows = np.flatnonzero(codes >= 0)
+            X[rows, j + codes[rows]] = 1.0
+            j += len(self.vocabularies[col])
+        return X
+
+    @classmethod
+    def train(cls, df, l2=DEFAULT_L2, seed=DEFAULT_SEED, holdout=HOLDOUT_FRACTION):
+        """Entraîne le modèle par la méthode de Newton (moindres carrés repondérés)
+
+        Une fraction `holdout` des réservations, tirée au hasard, est écartée
+        de l'entraînement pour mesurer l'AUC, la log-vraisemblance et la
+        précision du modèle. À chaque itération, le gradient et XᵀWX sont
+        cumulés par blocs de TRAIN_BLOCK_ROWS lignes : la matrice des
+        variables n'existe jamais en entier, et la mémoire ne dépend pas du
+        nombre de réservations.
+        """
+        rng = np.random.default_rng(seed)
+        test = rng.random(len(df)) < holdout
+        columns = MODEL_COLUMNS + [TARGET]
+        train_df, test_df = df.loc[~test, columns], df.loc[test, columns]
+
+        means, stds, vocabularies = cls._fit_encoding(train_df)
+        n_features = (len(NUMERIC_FEATURES) + len(PRESENCE_FEATURES)
+                      + sum(len(v) for v in vocabularies.values()))
+        model = cls(means, stds, vocabularies, 0.0, np.zeros(n_features))
+
+        penalty = np.full(n_features + 1, l2)
+        penalty[0] = 0.0  # l'ordonnée à l'origine n'est pas régularisée
+
+        w = np.zeros(n_features + 1)
+        for iteration in range(1, MAX_ITERATIONS + 1):
+            gradient = penalty * w
+            hessian = np.diag(penalty)
+            for start in range(0, len(train_df), TRAIN_BLOCK_ROWS):
+                block = train_df.iloc[start:start + TRAIN_BLOCK_ROWS]
+                X = model.design_matrix(block, intercept=True)
+                p = _sigmoid(X @ w)
+                gradient += X.T @ (p - block[TARGET].to_numpy(dtype=np.float64))
+                # XᵀWX sans copie pondérée : X est mis à l'échelle de sqrt(w) sur place
+                X *= np.sqrt(p * (1 - p))[:, None]
+                hessian += X.T @ X
+            step = np.linalg.solve(hessian, gradient)
+            w -= step
+            if np.abs(step).max() < TOLERANCE:
+                break
+
+        model.bias, model.weights = float(w[0]), w[1:]
+        model.metrics = {'train_rows': len(train_df), 'iterations': iteration, 'l2': l2}
+        if len(test_df):
+            model.metrics.update(model.evaluate(test_df))
+        return model
+
+    def evaluate(self, df):
+        """AUC, log-vraisemblance moyenne et précision (seuil 0,5) sur des réservations"""
+        y = df[TARGET].to_numpy()
+        p = self.predict_proba(df).astype(np.float64)
+        eps = 1e-12
+        log_loss = -np.mean(y * np.log(p + eps) + (1 - y) * np.log(1 - p + eps))
+        return {
+            'test_rows': len(df),
+            'auc': auc_score(y, p),
+            'log_loss': float(log_loss),
+            'accuracy': float(np.mean((p >= 0.5) == (y == 1))),
+            'base_rate': float(y.mean()),
+        }
+
+    def decision_function(self, df):
+        """Logit de chaque réservation, sans matrice intermédiaire"""
+        z = np.full(len(df), self.bias)
+        j = 0
+        for col in NUMERIC_FEATURES:
+            w = self.weights[j] / self.stds[col]
+            z += w * _numeric_values(df, col)
+            z -= w * self.means[col]
+            j += 1
+        for col in PRESENCE_FEATURES:
+            z += self.weights[j] * (df[col].to_numpy(dtype=np.float64, na_value=0.0) > 0)
+            j += 1
+        for col in CATEGORICAL_FEATURES:
+            size = len(self.vocabularies[col])
+            # Poids des modalités, suivi d'un 0 pour les valeurs hors vocabulaire (code -1)
+            table = np.append(self.weights[j:j + size], 0.0)
+            z += table[_category_codes(df, col, self.vocabularies[col])]
+            j += size
+        return z
+
+    def predict_proba(self, df):
+        """Probabilité d'annulation de chaque réservation (float32)"""
+        return _sigmoid(self.decision_function(df)).astype(np.float32)
+
+    def top_features(self, n=10):
+        """Variables de plus grand poids absolu"""
+        order = np.argsort(-np.abs(self.weights))[:n]
+        names = self.feature_names
+        return [(names[i], float(self.weights[i])) for i in order]
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        payload = {
+            'means': self.means, 'stds': self.stds, 'vocabularies': self.vocabularies,
+            'bias': self.bias, 'weights': self.weights.tolist(), 'metrics': self.metrics,
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path) as f:
+            payload = json.load(f)
+        return cls(payload['means'], payload['stds'], payload['vocabularies'],
+                   payload['bias'], np.asarray(payload['weights']), payload['metrics'])
+
+
+def train_model(path=DATA_PATH, model_path=MODEL_PATH, l2=DEFAULT_L2, seed=DEFAULT_SEED):
+    """Entraîne le modèle sur les données nettoyées, l'enregistre et affiche ses mesures"""
+    from data_cache import load_clean_data
+
+    df = load_clean_data(path)
+    start = time.perf_counter()
+    model = CancellationModel.train(df, l2=l2, seed=seed)
+    elapsed = time.perf_counter() - start
+    model.save(model_path)
+
+    metrics = model.metrics
+    print(f"Modèle entraîné sur {metrics['train_rows']:,} réservations en {elapsed:.2f} s "
+          f"({metrics['iterations']} itérations) -> {model_path}")
+    if 'auc' in metrics:
+        print(f"Validation ({metrics['test_rows']:,} réservations) : AUC {metrics['auc']:.3f}, "
+              f"log-vraisemblance {metrics['log_loss']:.3f}, précision {metrics['accuracy'] * 100:.1f}% "
+              f"(taux d'annulation {metrics['base_rate'] * 100:.1f}%)")
+    print("Variables les plus influentes :")
+    for name, weight in model.top_features():
+        print(f"   {weight:+.3f}  {name}")
+    return model
+
+
+def _last_record_end(data):
+    """Position suivant le dernier saut de ligne hors guillemets, None si aucun
+
+    `data` commence au début d'un enregistrement : un saut de ligne termine
+    un enregistrement si le nombre de guillemets qui le précèdent est pair
+    (un guillemet échappé "" compte deux fois).
+    """
+    end = data.rfind(b'\n')
+    while end >= 0:
+        if data.count(b'"', 0, end) % 2 == 0:
+            return end + 1
+        end = data.rfind(b'\n', 0, end)
+    return None
+
+
+def csv_blocks(path, block_bytes):
+    """Noms des colonnes et plages d'octets (début, fin) découpées entre deux enregistrements
+
+    Un champ entre guillemets contenant un saut de ligne n'est jamais coupé.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        names = next(csv.reader([f.readline().decode('utf-8-sig')]))
+        blocks = []
+        start = f.tell()
+        while start < size:
+            data = f.read(block_bytes)
+            end = None if start + len(data) < size else len(data)
+            while end is None:
+                end = _last_record_end(data)
+                if end is None:
+                    # Enregistrement plus long qu'un bloc : lecture de la suite
+                    more = f.read(block_bytes)
+                    data += more
+                    if start + len(data) >= size:
+                        end = len(data)
+            blocks.append((start, start + end))
+            start += end
+            f.seek(start)
+    return names, blocks
+
+
+def _block_bytes(path, chunksize):
+    """Taille en octets d'un bloc d'environ `chunksize` lignes (longueur moyenne des 1000 premières)"""
+    with open(path, 'rb') as f:
+        f.readline()
+        lines = [len(line) for _, line in zip(range(1000), f)]
+    return max(1, int(chunksize * (sum(lines) / max(len(lines), 1))))
+
+
+# Modèle du processus courant (chargé une fois par processus du pool)
+_model = None
+
+
+def _load_worker_model(model_path):
+    global _model
+    _model = CancellationModel.load(model_path)
+
+
+def score_block(job):
+    """Lit une plage d'octets du fichier CSV et retourne les probabilités de ses lignes"""
+    path, start, end, names = job
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    usecols = [col for col in MODEL_COLUMNS if col in names]
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=names, **read_csv_kwargs(usecols))
+    return _model.predict_proba(chunk)
+
+
+def score_file(path, output_path, model_path=MODEL_PATH, chunksize=DEFAULT_CHUNKSIZE, n_workers=1):
+    """Note toutes les réservations d'un fichier CSV, bloc par bloc
+
+    Chaque bloc est lu, encodé et noté indépendamment ; avec n_workers > 1,
+    dans un pool de processus qui lisent eux-mêmes leur plage du fichier.
+    Le fichier de sortie contient une ligne par réservation, dans l'ordre du
+    fichier d'entrée : sa position (`row`, 0 pour la première ligne de
+    données) et sa probabilité d'annulation. Affiche le débit et retourne le
+    nombre de lignes notées.
+    """
+    start = time.perf_counter()
+    names, blocks = csv_blocks(path, _block_bytes(path, chunksize))
+    missing = [col for col in MODEL_COLUMNS if col not in names]
+    if missing:
+        raise ValueError(f"colonnes manquantes dans {path} : {', '.join(missing)}")
+    jobs = [(path, block_start, block_end, names) for block_start, block_end in blocks]
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    schema = pa.schema([(ROW_COLUMN, pa.int64()), (SCORE_COLUMN, pa.float32())])
+    n_rows = 0
+    with pa_csv.CSVWriter(output_path, schema) as writer:
+        if n_workers and n_workers > 1:
+            pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_load_worker_model,
+                                       initargs=(model_path,))
+            results = pool.map(score_block, jobs)
+        else:
+            pool = None
+            _load_worker_model(model_path)
+            results = map(score_block, jobs)
+        try:
+            # Les blocs arrivent dans l'ordre du fichier : leur position de départ
+            # est le nombre de lignes déjà écrites
+            for scores in results:
+                rows = np.arange(n_rows, n_rows + len(scores), dtype=np.int64)
+                writer.write_table(pa.table({ROW_COLUMN: rows, SCORE_COLUMN: scores}, schema=schema))
+                n_rows += len(scores)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    elapsed = time.perf_counter() - start
+    print(f"{n_rows:,} réservations notées en {elapsed:.2f} s ({len(jobs)} blocs, {n_workers} processus) "
+          f"-> {output_path}")
+    print(f"Débit : {n_rows / elapsed:,.0f} réservations/s ({n_rows / elapsed * 60 / 1e6:.1f} millions/min)")
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Modèle de risque d'annulation")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train = subparsers.add_parser('train', help="Entraîner le modèle sur les données nettoyées")
+    train.add_argument('--data', default=DATA_PATH, help="Chemin du fichier CSV des réservations")
+    train.add_argument('--model', default=MODEL_PATH, help="Fichier du modèle (JSON)")
+    train.add_argument('--l2', type=float, default=DEFAULT_L2, help="Régularisation L2")
+    train.add_argument('--seed', type=int, default=DEFAULT_SEED)
+
+    score = subparsers.add_parser('score', help="Noter un fichier CSV de réservations par blocs")
+    score.add_argument('input', help="Fichier CSV des réservations à noter")
+    score.add_argument('--output', default='output/cancellation_scores.csv')
+    score.add_argument('--model', default=MODEL_PATH, help="Fichier du modèle (JSON)")
+    score.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                       help="Nombre approximatif de lignes par bloc")
+    score.add_argument('--workers', type=int, default=1, help="Nombre de processus")
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        train_model(args.data, args.model, args.l2, args.seed)
+    else:
+        score_file(args.input, args.output, args.model, args.chunksize, args.workers)
+
+
+if __name__ == "__main__":
+    main()
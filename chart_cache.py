@@ -0,0 +1,134 @@
+"""
+Cache des graphiques adressé par contenu (PNG partagés par output/ et le rapport PDF)
+"""
+
+import hashlib
+import json
+import os
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CACHE_DIR, cache_key
+
+CHART_CACHE_DIR = os.path.join(CACHE_DIR, 'charts')
+MANIFEST_FILE = 'manifest.json'
+
+# Le code de rendu et les versions des bibliothèques font partie des
+# paramètres de rendu : les modifier invalide les images en cache
+RENDERER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chart_rendering.py')
+RENDERER_PACKAGES = ['matplotlib', 'seaborn']
+
+_renderer_fingerprint = None
+
+
+def renderer_fingerprint():
+    """Empreinte du code de rendu et des versions de matplotlib et seaborn
+
+    Le fichier source est lu sans être importé : vérifier le cache ne charge
+    pas matplotlib.
+    """
+    global _renderer_fingerprint
+    if _renderer_fingerprint is None:
+        digest = hashlib.sha256()
+        with open(RENDERER_SOURCE, 'rb') as f:
+            digest.update(f.read())
+        for package in RENDERER_PACKAGES:
+            try:
+                digest.update(f"{package}={metadata.version(package)}".encode('utf-8'))
+            except metadata.PackageNotFoundError:
+                digest.update(package.encode('utf-8'))
+        _renderer_fingerprint = digest.hexdigest()
+    return _renderer_fingerprint
+
+
+def _update_digest(digest, value):
+    """Ajoute une représentation exacte et déterministe de l'agrégat à l'empreinte"""
+    if isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(repr(key).encode('utf-8'))
+            _update_digest(digest, value[key])
+    elif isinstance(value, pd.DataFrame):
+        digest.update(b'DataFrame')
+        _update_digest(digest, value.columns)
+        _update_digest(digest, value.index)
+        _update_digest(digest, value.to_numpy())
+    elif isinstance(value, pd.Series):
+        digest.update(f"Series:{value.name!r}".encode('utf-8'))
+        _update_digest(digest, value.index)
+        _update_digest(digest, value.to_numpy())
+    elif isinstance(value, pd.Index):
+        digest.update(f"Index:{value.name!r}".encode('utf-8'))
+        _update_digest(digest, value.to_numpy())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype.str}{value.shape}".encode('utf-8'))
+        if value.dtype == object:
+            digest.update(repr(value.tolist()).encode('utf-8'))
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+
+def chart_key(name, payload):
+    """Clé d'un graphique : nom, agrégat d'entrée et paramètres de rendu"""
+    digest = hashlib.sha256(name.encode('utf-8'))
+    _update_digest(digest, payload)
+    digest.update(renderer_fingerprint().encode('ascii'))
+    return digest.hexdigest()[:24]
+
+
+def chart_path(key):
+    return os.path.join(CHART_CACHE_DIR, f"{key}.png")
+
+
+def _load_manifest():
+    path = os.path.join(CHART_CACHE_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _prune(manifest):
+    """Supprime les images qui ne sont plus référencées par le manifeste"""
+    referenced = {f"{chart['key']}.png" for entry in manifest.values() for chart in entry['charts']}
+    for entry in os.listdir(CHART_CACHE_DIR):
+        if entry.endswith('.png') and entry not in referenced:
+            os.remove(os.path.join(CHART_CACHE_DIR, entry))
+
+
+def record_charts(source, charts):
+    """Mémorise les graphiques produits à partir d'un fichier de données
+
+    `charts` est une liste de (nom, libellé, clé). Le rapport PDF retrouve
+    ainsi les images correspondant aux données actuelles sans les redessiner.
+    """
+    manifest = _load_manifest()
+    manifest[os.path.abspath(source)] = {
+        'data_key': cache_key(source),
+        'charts': [{'name': name, 'label': label, 'key': key} for name, label, key in charts],
+    }
+    os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    path = os.path.join(CHART_CACHE_DIR, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    _prune(manifest)
+
+
+def cached_charts(source):
+    """Graphiques en cache pour les données actuelles du fichier : liste de (libellé, chemin)
+
+    Liste vide si les graphiques n'ont pas été produits pour ces données.
+    """
+    entry = _load_manifest().get(os.path.abspath(source))
+    if entry is None or entry['data_key'] != cache_key(source):
+        return []
+    charts = [(chart['label'], chart_path(chart['key'])) for chart in entry['charts']]
+    return [(label, path) for label, path in charts if os.path.exists(path)]
@@ -0,0 +1,148 @@
+"""
+Rendu des graphiques d'analyse (matplotlib / seaborn)
+
+Module importé uniquement lorsque des graphiques sont produits : les
+commandes qui ne calculent que des statistiques ne chargent pas matplotlib.
+"""
+
+import os
+import time
+
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from profiling import peak_rss_mb
+
+DPI = 300
+
+
+def configure_style():
+    """Applique le style graphique commun (processus principal et processus de rendu)"""
+    try:
+        plt.style.use('seaborn-v0_8-darkgrid')
+    except OSError:
+        plt.style.use('seaborn-darkgrid')
+    sns.set_palette("husl")
+    plt.rcParams['figure.figsize'] = (12, 6)
+
+
+MONTH_LABELS = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun',
+                'Jul', 'Aoû', 'Sep', 'Oct', 'Nov', 'Déc']
+
+
+def _plot_taux_annulation(cancellation_by_hotel, path):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    cancellation_by_hotel.plot(kind='bar', ax=ax, color=['#3498db', '#e74c3c'])
+    ax.set_title('Taux d\'annulation par type d\'hôtel', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Type d\'hôtel', fontsize=12)
+    ax.set_ylabel('Taux d\'annulation (%)', fontsize=12)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation=0)
+    for i, v in enumerate(cancellation_by_hotel):
+        ax.text(i, v + 1, f'{v:.1f}%', ha='center', va='bottom', fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_distribution_prix(histogram, path):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    edges = histogram['edges']
+    ax.hist(edges[:-1], bins=edges, weights=histogram['counts'], color='#9b59b6', edgecolor='black')
+    ax.grid(True)
+    ax.set_title('Distribution des prix moyens journaliers (ADR)', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Prix par nuit (€)', fontsize=12)
+    ax.set_ylabel('Nombre de réservations', fontsize=12)
+    ax.axvline(histogram['mean'], color='red', linestyle='--', linewidth=2, 
+               label=f'Moyenne: {histogram["mean"]:.2f}€')
+    ax.legend()
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_reservations_par_mois(bookings_by_month, path):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bookings_by_month.plot(kind='line', marker='o', ax=ax, color='#27ae60', linewidth=2, markersize=8)
+    ax.set_title('Nombre de réservations par mois', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Mois', fontsize=12)
+    ax.set_ylabel('Nombre de réservations', fontsize=12)
+    ax.set_xticks(range(1, 13))
+    ax.set_xticklabels(MONTH_LABELS)
+    ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_duree_sejour(stay_by_hotel, path):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    stay_by_hotel.plot(kind='bar', ax=ax, color=['#f39c12', '#16a085'])
+    ax.set_title('Durée moyenne de séjour par type d\'hôtel', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Type d\'hôtel', fontsize=12)
+    ax.set_ylabel('Durée moyenne (nuits)', fontsize=12)
+    ax.set_xticklabels(ax.get_xticklabels(), rotation=0)
+    for i, v in enumerate(stay_by_hotel):
+        ax.text(i, v + 0.1, f'{v:.1f}', ha='center', va='bottom', fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_top_pays(top_countries, path):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    top_countries.plot(kind='barh', ax=ax, color='#e67e22')
+    ax.set_title('Top 10 des pays d\'origine des clients', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Nombre de réservations', fontsize=12)
+    ax.set_ylabel('Pays', fontsize=12)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_correlation_matrix(correlation_df, path):
+    fig, ax = plt.subplots(figsize=(12, 10))
+    sns.heatmap(correlation_df, annot=True, fmt='.2f', cmap='coolwarm', 
+                center=0, square=True, linewidths=1, ax=ax, cbar_kws={"shrink": 0.8})
+    ax.set_title('Matrice de corrélation entre les variables numériques', 
+                 fontsize=16, fontweight='bold', pad=20)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+def _plot_segment_marche(market_segment, path):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    market_segment.plot(kind='bar', ax=ax, color='#3498db')
+    ax.set_title('Répartition des réservations par segment de marché', 
+                 fontsize=16, fontweight='bold')
+    ax.set_xlabel('Segment de marché', fontsize=12)
+    ax.set_ylabel('Nombre de réservations', fontsize=12)
+    ax.tick_params(axis='x', rotation=45)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+CHART_RENDERERS = {
+    'taux_annulation': _plot_taux_annulation,
+    'distribution_prix': _plot_distribution_prix,
+    'reservations_par_mois': _plot_reservations_par_mois,
+    'duree_sejour': _plot_duree_sejour,
+    'top_pays': _plot_top_pays,
+    'correlation_matrix': _plot_correlation_matrix,
+    'segment_marche': _plot_segment_marche,
+}
+
+
+def render_chart(name, payload, path):
+    """Dessine un graphique à partir de son agrégat (exécutable dans un processus de rendu)
+
+    L'image est écrite dans un fichier temporaire puis renommée en `path`, si
+    bien qu'un fichier présent est toujours complet. Retourne les temps mur et
+    CPU du rendu et le pic RSS du processus qui l'exécute.
+    """
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    tmp_path = f"{path}.{os.getpid()}.tmp.png"
+    CHART_RENDERERS[name](payload, tmp_path)
+    os.replace(tmp_path, path)
+    return time.perf_counter() - start_wall, time.process_time() - start_cpu, peak_rss_mb()
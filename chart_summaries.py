@@ -0,0 +1,72 @@
+"""
+Résumés de taille constante pour les graphiques du tableau de bord
+"""
+
+import numpy as np
+
+MAX_OUTLIERS = 200
+
+
+def box_summary(values, max_outliers=MAX_OUTLIERS):
+    """Résumé d'une boîte à moustaches : quartiles, moustaches et valeurs extrêmes
+
+    Les quartiles sont exacts (interpolation linéaire, comme Plotly). Les
+    moustaches s'arrêtent aux valeurs les plus éloignées situées à moins de
+    1,5 × IQR des quartiles. Au plus `max_outliers` valeurs extrêmes sont
+    conservées, réparties uniformément sur leur plage (minimum et maximum
+    inclus), si bien que la taille du résultat ne dépend pas du nombre de lignes.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low, high = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = (values >= low) & (values <= high)
+    outliers = np.sort(values[~inside])
+    if len(outliers) > max_outliers:
+        positions = np.linspace(0, len(outliers) - 1, max_outliers).round().astype(int)
+        outliers = outliers[positions]
+
+    return {
+        'n': len(values),
+        'mean': float(values.mean()),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'lowerfence': float(values[inside].min()),
+        'upperfence': float(values[inside].max()),
+        'outliers': outliers.tolist(),
+    }
+
+
+def box_summaries_by_group(df, column, by='hotel', max_outliers=MAX_OUTLIERS):
+    """Résumés de boîte à moustaches de `column` pour chaque valeur de `by`"""
+    summaries = {}
+    for key, group in df.groupby(by, observed=True)[column]:
+        summary = box_summary(group.to_numpy(), max_outliers)
+        if summary is not None:
+            summaries[str(key)] = summary
+    return summaries
+
+
+def histogram_edges(upper, bins=50, lower=0):
+    """Bornes fixes de `bins` classes de largeur entière couvrant [lower, upper]"""
+    width = max(1, int(np.ceil((upper - lower) / bins)))
+    return lower + width * np.arange(bins + 1, dtype=np.float64)
+
+
+def bin_codes(values, edges):
+    """Numéro de classe de chaque valeur (classes semi-ouvertes [a, b[), -1 hors bornes"""
+    codes = np.searchsorted(edges, np.asarray(values, dtype=np.float64), side='right') - 1
+    codes[(codes < 0) | (codes >= len(edges) - 1)] = -1
+    return codes.astype(np.int16)
+
+
+def grouped_histogram(group_codes, codes, n_groups, n_bins):
+    """Effectifs par groupe et par classe (tableau n_groups × n_bins) via bincount"""
+    valid = (codes >= 0) & (group_codes >= 0)
+    flat = group_codes[valid].astype(np.int64) * n_bins + codes[valid]
+    return np.bincount(flat, minlength=n_groups * n_bins).reshape(n_groups, n_bins)
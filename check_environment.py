@@ -15,6 +15,7 @@ print(f"Version: {sys.version}\n")
 required_packages = {
     'pandas': 'pandas',
     'numpy': 'numpy',
+    'pyarrow': 'pyarrow',
     'matplotlib': 'matplotlib',
     'seaborn': 'seaborn',
     'plotly': 'plotly',
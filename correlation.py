@@ -0,0 +1,83 @@
+"""
+Matrice de corrélation calculée par blocs à partir de statistiques suffisantes
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BLOCK_SIZE = 200_000
+
+
+class CorrelationAccumulator:
+    """Accumule n, Σx et XᵀX (float64) pour calculer des corrélations de Pearson
+
+    Les sommes sont calculées sur les données décalées d'un point de référence
+    (la moyenne du premier bloc) pour limiter les pertes de précision. Deux
+    accumulateurs portant sur les mêmes colonnes peuvent être fusionnés.
+    Les lignes contenant une valeur manquante sont ignorées.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.shift = None
+        self.sum = np.zeros(k)
+        self.xtx = np.zeros((k, k))
+
+    def update(self, df):
+        """Ajoute un bloc de lignes"""
+        x = df[self.columns].to_numpy(dtype=np.float64)
+        x = x[~np.isnan(x).any(axis=1)]
+        if len(x) == 0:
+            return self
+        if self.shift is None:
+            self.shift = x.mean(axis=0)
+        x -= self.shift
+        self.n += len(x)
+        self.sum += x.sum(axis=0)
+        self.xtx += x.T @ x
+        return self
+
+    def merge(self, other):
+        """Fusionne un accumulateur calculé sur une autre partition"""
+        if other.columns != self.columns:
+            raise ValueError("Les accumulateurs ne portent pas sur les mêmes colonnes")
+        if other.n == 0:
+            return self
+        if self.shift is None:
+            self.n, self.shift = other.n, other.shift.copy()
+            self.sum, self.xtx = other.sum.copy(), other.xtx.copy()
+            return self
+
+        # Ramène les sommes de l'autre accumulateur au point de référence de celui-ci
+        d = other.shift - self.shift
+        self.xtx += (other.xtx + np.outer(d, other.sum) + np.outer(other.sum, d)
+                     + other.n * np.outer(d, d))
+        self.sum += other.sum + other.n * d
+        self.n += other.n
+        return self
+
+    def corr(self):
+        """Matrice de corrélation de Pearson"""
+        if self.n == 0:
+            return pd.DataFrame(np.nan, index=self.columns, columns=self.columns)
+        mean = self.sum / self.n
+        cov = self.xtx / self.n - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        corr = np.clip(corr, -1, 1)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def accumulate_correlation(df, columns, block_size=DEFAULT_BLOCK_SIZE):
+    """Accumulateur de corrélation d'un DataFrame, parcouru par blocs de lignes
+
+    Seul un bloc de la matrice numérique est matérialisé à la fois.
+    """
+    accumulator = CorrelationAccumulator(columns)
+    for start in range(0, len(df), block_size):
+        accumulator.update(df.iloc[start:start + block_size])
+    return accumulator
@@ -1,136 +1,136 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 
-os.makedirs('output', exist_ok=True)
+from chart_cache import CHART_CACHE_DIR, chart_key, chart_path, record_charts
+from correlation import accumulate_correlation
+from data_cleaning import clean_data
+from data_loading import DATA_PATH, DEFAULT_CHUNKSIZE, iter_chunks
+from deduplication import Deduplicator
+from profiling import active_profiler, span
+from stats_engine import BookingAggregates
 
 
 def analyze_data(df):
-    """Calcule les statistiques principales"""
-    stats = {}
-    
-    stats['total_bookings'] = len(df)
-    stats['cancellation_rate'] = (df['is_canceled'] == 1).sum() / len(df)
-    stats['avg_price'] = df['adr'].mean()
-    stats['avg_stay'] = df['total_stay'].mean()
-    stats['avg_adults'] = df['adults'].mean()
-    stats['total_revenue'] = df['total_revenue'].sum()
-    
-    stats['city_hotel_bookings'] = len(df[df['hotel'] == 'City Hotel'])
-    stats['resort_hotel_bookings'] = len(df[df['hotel'] == 'Resort Hotel'])
-    
-    df['arrival_month'] = pd.to_datetime(df['arrival_date_year'].astype(str) + 
-                                         '-' + df['arrival_date_month'].astype(str) + 
-                                         '-01')
-    stats['busiest_month'] = df.groupby('arrival_month').size().idxmax().strftime('%B %Y')
-    
-    return stats
-
-
-def visualize_data(df):
-    """Génère tous les graphiques d'analyse"""
-    plt.rcParams['figure.figsize'] = (12, 6)
-    
-    print("   • Graphique 1: Taux d'annulation...")
-    fig, ax = plt.subplots(figsize=(10, 6))
-    cancellation_by_hotel = df.groupby('hotel')['is_canceled'].mean() * 100
-    cancellation_by_hotel.plot(kind='bar', ax=ax, color=['#3498db', '#e74c3c'])
-    ax.set_title('Taux d\'annulation par type d\'hôtel', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Type d\'hôtel', fontsize=12)
-    ax.set_ylabel('Taux d\'annulation (%)', fontsize=12)
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=0)
-    for i, v in enumerate(cancellation_by_hotel):
-        ax.text(i, v + 1, f'{v:.1f}%', ha='center', va='bottom', fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('output/1_taux_annulation.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print("   • Graphique 2: Distribution des prix...")
-    fig, ax = plt.subplots(figsize=(12, 6))
-    df[df['adr'] < 500]['adr'].hist(bins=50, ax=ax, color='#9b59b6', edgecolor='black')
-    ax.set_title('Distribution des prix moyens journaliers (ADR)', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Prix par nuit (€)', fontsize=12)
-    ax.set_ylabel('Nombre de réservations', fontsize=12)
-    ax.axvline(df['adr'].mean(), color='red', linestyle='--', linewidth=2, 
-               label=f'Moyenne: {df["adr"].mean():.2f}€')
-    ax.legend()
-    plt.tight_layout()
-    plt.savefig('output/2_distribution_prix.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print("   • Graphique 3: Réservations par mois...")
-    df['arrival_date_month_num'] = pd.to_datetime(df['arrival_date_month'], format='%B').dt.month
-    bookings_by_month = df.groupby('arrival_date_month_num').size()
-    month_names = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun', 
-                   'Jul', 'Aoû', 'Sep', 'Oct', 'Nov', 'Déc']
-    
-    fig, ax = plt.subplots(figsize=(12, 6))
-    bookings_by_month.plot(kind='line', marker='o', ax=ax, color='#27ae60', linewidth=2, markersize=8)
-    ax.set_title('Nombre de réservations par mois', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Mois', fontsize=12)
-    ax.set_ylabel('Nombre de réservations', fontsize=12)
-    ax.set_xticks(range(1, 13))
-    ax.set_xticklabels(month_names)
-    ax.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('output/3_reservations_par_mois.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print("   • Graphique 4: Durée de séjour...")
-    fig, ax = plt.subplots(figsize=(10, 6))
-    stay_by_hotel = df.groupby('hotel')['total_stay'].mean()
-    stay_by_hotel.plot(kind='bar', ax=ax, color=['#f39c12', '#16a085'])
-    ax.set_title('Durée moyenne de séjour par type d\'hôtel', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Type d\'hôtel', fontsize=12)
-    ax.set_ylabel('Durée moyenne (nuits)', fontsize=12)
-    ax.set_xticklabels(ax.get_xticklabels(), rotation=0)
-    for i, v in enumerate(stay_by_hotel):
-        ax.text(i, v + 0.1, f'{v:.1f}', ha='center', va='bottom', fontweight='bold')
-    plt.tight_layout()
-    plt.savefig('output/4_duree_sejour.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print("   • Graphique 5: Top 10 pays...")
-    top_countries = df['country'].value_counts().head(10)
-    fig, ax = plt.subplots(figsize=(12, 6))
-    top_countries.plot(kind='barh', ax=ax, color='#e67e22')
-    ax.set_title('Top 10 des pays d\'origine des clients', fontsize=16, fontweight='bold')
-    ax.set_xlabel('Nombre de réservations', fontsize=12)
-    ax.set_ylabel('Pays', fontsize=12)
-    plt.tight_layout()
-    plt.savefig('output/5_top_pays.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print("   • Graphique 6: Matrice de corrélation...")
-    numeric_cols = ['is_canceled', 'lead_time', 'arrival_date_year', 
-                    'arrival_date_week_number', 'stays_in_weekend_nights',
-                    'stays_in_week_nights', 'adults', 'children', 'babies',
-                    'adr', 'required_car_parking_spaces', 'total_of_special_requests']
-    
-    correlation_df = df[numeric_cols].corr()
-    fig, ax = plt.subplots(figsize=(12, 10))
-    sns.heatmap(correlation_df, annot=True, fmt='.2f', cmap='coolwarm', 
-                center=0, square=True, linewidths=1, ax=ax, cbar_kws={"shrink": 0.8})
-    ax.set_title('Matrice de corrélation entre les variables numériques', 
-                 fontsize=16, fontweight='bold', pad=20)
-    plt.tight_layout()
-    plt.savefig('output/6_correlation_matrix.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print("   • Graphique 7: Segment de marché...")
-    market_segment = df['market_segment'].value_counts()
-    fig, ax = plt.subplots(figsize=(12, 6))
-    market_segment.plot(kind='bar', ax=ax, color='#3498db')
-    ax.set_title('Répartition des réservations par segment de marché', 
-                 fontsize=16, fontweight='bold')
-    ax.set_xlabel('Segment de marché', fontsize=12)
-    ax.set_ylabel('Nombre de réservations', fontsize=12)
-    ax.tick_params(axis='x', rotation=45)
-    plt.tight_layout()
-    plt.savefig('output/7_segment_marche.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    print("   Tous les graphiques ont été créés")
+    """Calcule les statistiques principales en un seul passage sur les données"""
+    return BookingAggregates().update(df).to_stats()
 
+
+def analyze_file(path=DATA_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """Calcule les statistiques principales d'un fichier bloc par bloc
+
+    Chaque bloc est nettoyé puis agrégé, sans jamais charger le fichier en
+    entier : la mémoire reste bornée par la taille d'un bloc plus 8 octets
+    d'empreinte par réservation, qui suffisent à supprimer les doublons d'un
+    bloc à l'autre comme le ferait analyze_data sur le fichier complet.
+    """
+    aggregates = BookingAggregates()
+    dedup = Deduplicator()
+    for chunk in iter_chunks(path, chunksize):
+        aggregates.update(clean_data(chunk, inplace=True, dedup=dedup))
+    return aggregates.to_stats()
+
+
+CORRELATION_COLUMNS = ['is_canceled', 'lead_time', 'arrival_date_year', 
+                       'arrival_date_week_number', 'stays_in_weekend_nights',
+                       'stays_in_week_nights', 'adults', 'children', 'babies',
+                       'adr', 'required_car_parking_spaces', 'total_of_special_requests']
+
+# Colonnes lues par analyze_data et visualize_data
+ANALYSIS_COLUMNS = list(dict.fromkeys(
+    ['hotel', 'arrival_year_month', 'arrival_month_num', 'country', 'market_segment']
+    + list(BookingAggregates.SUMS.values()) + CORRELATION_COLUMNS))
+
+
+def _adr_histogram(df):
+    counts, edges = np.histogram(df.loc[df['adr'] < 500, 'adr'], bins=50)
+    return {'counts': counts, 'edges': edges, 'mean': df['adr'].mean()}
+
+
+OUTPUT_DIR = 'output'
+
+# Graphiques : nom, libellé et calcul de l'agrégat à partir des données nettoyées
+CHARTS = [
+    ('taux_annulation', "Graphique 1: Taux d'annulation",
+     lambda df: df.groupby('hotel', observed=True)['is_canceled'].mean() * 100),
+    ('distribution_prix', "Graphique 2: Distribution des prix", _adr_histogram),
+    ('reservations_par_mois', "Graphique 3: Réservations par mois",
+     lambda df: df.groupby('arrival_month_num').size()),
+    ('duree_sejour', "Graphique 4: Durée de séjour",
+     lambda df: df.groupby('hotel', observed=True)['total_stay'].mean()),
+    ('top_pays', "Graphique 5: Top 10 pays",
+     lambda df: df['country'].value_counts().head(10)),
+    ('correlation_matrix', "Graphique 6: Matrice de corrélation",
+     lambda df: accumulate_correlation(df, CORRELATION_COLUMNS).corr()),
+    ('segment_marche', "Graphique 7: Segment de marché",
+     lambda df: df['market_segment'].value_counts()),
+]
+
+
+def _chart_payloads(df):
+    """Calcule les agrégats nécessaires à chaque graphique
+
+    Seules ces petites séries sont transmises aux fonctions de rendu, ce qui
+    permet de les exécuter dans d'autres processus sans copier le DataFrame.
+    """
+    payloads = []
+    for name, label, compute in CHARTS:
+        with span(name, 'chart_data'):
+            payloads.append((name, label, compute(df)))
+    return payloads
+
+
+def visualize_data(df, n_workers=1, source=None):
+    """Génère tous les graphiques d'analyse dans output/
+
+    Chaque image est mise en cache sous une clé calculée à partir de son
+    agrégat et des paramètres de rendu : seuls les graphiques dont l'agrégat
+    a changé sont redessinés, et matplotlib n'est chargé que dans ce cas.
+    Avec n_workers > 1, les graphiques à redessiner sont rendus dans un pool
+    de processus ; seuls leurs agrégats sont transmis aux processus. Si
+    `source` (fichier de données) est fourni, les images sont associées à ce
+    fichier pour être reprises dans le rapport PDF.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    payloads = _chart_payloads(df)
+    profiler = active_profiler()
+
+    charts, missing = [], []
+    for name, label, payload in payloads:
+        key = chart_key(name, payload)
+        charts.append((name, label, key))
+        if os.path.exists(chart_path(key)):
+            print(f"   • {label} (en cache)")
+        else:
+            missing.append((name, label, payload, chart_path(key)))
+
+    if missing:
+        from chart_rendering import configure_style, render_chart
+
+        os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+        configure_style()
+        if n_workers and n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=configure_style) as pool:
+                futures = []
+                for name, label, payload, path in missing:
+                    print(f"   • {label}...")
+                    futures.append((name, pool.submit(render_chart, name, payload, path)))
+                for name, future in futures:
+                    wall, cpu, rss = future.result()
+                    if profiler is not None:
+                        profiler.add(name, 'chart', wall, cpu, rss_peak_mb=rss)
+        else:
+            for name, label, payload, path in missing:
+                print(f"   • {label}...")
+                with span(name, 'chart'):
+                    render_chart(name, payload, path)
+
+    for position, (name, label, key) in enumerate(charts, start=1):
+        shutil.copyfile(chart_path(key), os.path.join(OUTPUT_DIR, f"{position}_{name}.png"))
+    if source is not None:
+        record_charts(source, charts)
+
+    print(f"   Tous les graphiques ont été créés ({len(missing)} redessinés, "
+          f"{len(charts) - len(missing)} repris du cache)")
@@ -0,0 +1,168 @@
+"""
+Cache persistant des données nettoyées (format colonnaire Arrow/Feather)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import data_cleaning
+import data_loading
+import deduplication
+import memory_budget
+from data_loading import DATA_PATH
+
+CACHE_DIR = 'cache'
+FINGERPRINTS_FILE = 'fingerprints.json'
+HASH_BLOCK_SIZE = 1024 * 1024
+# Métadonnées du fichier de cache : types et tailles des colonnes avant réduction
+FOOTPRINT_METADATA = b'loaded_footprint'
+
+
+def _load_fingerprints():
+    path = os.path.join(CACHE_DIR, FINGERPRINTS_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_fingerprints(fingerprints):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, FINGERPRINTS_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(fingerprints, f, indent=2)
+
+
+def file_fingerprint(path):
+    """Calcule l'empreinte SHA-256 du contenu d'un fichier
+
+    Le résultat est mémorisé avec la taille et la date de modification du
+    fichier : tant que celles-ci ne changent pas, le fichier n'est pas relu.
+    """
+    stat = os.stat(path)
+    fingerprints = _load_fingerprints()
+    abs_path = os.path.abspath(path)
+    known = fingerprints.get(abs_path)
+    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    fingerprints[abs_path] = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest(),
+    }
+    _save_fingerprints(fingerprints)
+    return digest.hexdigest()
+
+
+def cleaning_fingerprint():
+    """Empreinte du code de chargement et de nettoyage
+
+    Toute modification du schéma de lecture, des règles de nettoyage ou de
+    la réduction des types change cette empreinte et invalide donc le cache.
+    """
+    digest = hashlib.sha256()
+    for module in (data_loading, data_cleaning, deduplication, memory_budget):
+        digest.update(inspect.getsource(module).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cache_key(path=DATA_PATH):
+    """Clé de cache : empreinte de la source combinée à celle du code de nettoyage"""
+    key = hashlib.sha256((file_fingerprint(path) + cleaning_fingerprint()).encode('ascii'))
+    return key.hexdigest()[:16]
+
+
+def cache_path(path=DATA_PATH):
+    """Chemin du fichier de cache correspondant à la source et au code actuels"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}_{cache_key(path)}.feather")
+
+
+def read_cache(path=DATA_PATH):
+    """Lit les données nettoyées depuis le cache, ou None si absent ou périmé"""
+    cached = cache_path(path)
+    if not os.path.exists(cached):
+        return None
+    table = feather.read_table(cached, memory_map=True)
+    return table.to_pandas()
+
+
+def read_cache_footprint(path=DATA_PATH):
+    """Types et tailles des colonnes avant la réduction des types faite pour le cache
+
+    Relevé (dtype_before, bytes_before par colonne) enregistré avec le cache,
+    ou None si absent ; seul le schéma du fichier est lu.
+    """
+    cached = cache_path(path)
+    if not os.path.exists(cached):
+        return None
+    with pa.memory_map(cached) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    if FOOTPRINT_METADATA not in metadata:
+        return None
+    footprint = pd.DataFrame(json.loads(metadata[FOOTPRINT_METADATA]))
+    footprint.index.name = 'column'
+    return footprint
+
+
+def write_cache(df, path=DATA_PATH, footprint=None):
+    """Écrit les données nettoyées dans le cache et supprime les versions périmées
+
+    `footprint`, le relevé retourné par optimize_memory, conserve avec le
+    cache les types et tailles des colonnes avant réduction.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cached = cache_path(path)
+    prefix = os.path.splitext(os.path.basename(path))[0] + '_'
+
+    table = pa.Table.from_pandas(df.reset_index(drop=True))
+    if footprint is not None:
+        loaded = footprint[['dtype_before', 'bytes_before']].to_dict()
+        table = table.replace_schema_metadata({**table.schema.metadata,
+                                               FOOTPRINT_METADATA: json.dumps(loaded)})
+    # Sans compression et en un seul lot pour permettre une lecture par
+    # projection mémoire sans copie (shared_dataset)
+    tmp_path = cached + '.tmp'
+    feather.write_feather(table, tmp_path, compression='uncompressed',
+                          chunksize=max(len(df), 1))
+    os.replace(tmp_path, cached)
+
+    for entry in os.listdir(CACHE_DIR):
+        stale = os.path.join(CACHE_DIR, entry)
+        if entry.startswith(prefix) and entry.endswith('.feather') and stale != cached:
+            os.remove(stale)
+    return cached
+
+
+def load_clean_data(path=DATA_PATH, use_cache=True, chunksize=None):
+    """Retourne les données nettoyées en réutilisant le cache si possible"""
+    if use_cache:
+        df_clean = read_cache(path)
+        if df_clean is not None:
+            print(f"   • Données nettoyées lues depuis le cache ({len(df_clean)} lignes)")
+            return df_clean
+
+    if chunksize:
+        df_clean = data_loading.load_clean_data_chunked(path, chunksize=chunksize)
+    else:
+        df_clean = data_cleaning.clean_data(data_loading.load_data(path), inplace=True)
+    _, footprint = memory_budget.optimize_memory(df_clean, inplace=True)
+
+    if use_cache:
+        write_cache(df_clean, path, footprint)
+    return df_clean
@@ -2,45 +2,124 @@
 import pandas as pd
 import numpy as np
 
+from deduplication import Deduplicator
+
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+MONTH_NUMBERS = {name: i for i, name in enumerate(MONTH_NAMES, start=1)}
+MONTH_DTYPE = pd.CategoricalDtype(MONTH_NAMES, ordered=True)
+
+# Valeur donnée aux pays manquants
+UNKNOWN_COUNTRY = 'Unknown'
+
+CATEGORICAL_COLUMNS = ['hotel', 'meal', 'country', 'market_segment',
+                       'distribution_channel', 'reserved_room_type',
+                       'assigned_room_type', 'deposit_type', 'customer_type',
+                       'reservation_status']
+
+# Règles de suppression des valeurs aberrantes : nom -> masque des lignes à retirer
+OUTLIER_RULES = {
+    'adr_negatif': lambda df, total_people, total_stay: df['adr'] < 0,
+    'adr_extreme': lambda df, total_people, total_stay: df['adr'] >= 10000,
+    'sans_personne': lambda df, total_people, total_stay: total_people <= 0,
+    'sans_nuitee': lambda df, total_people, total_stay: total_stay <= 0,
+}
+
+
+def _drop_mask(df, dedup=None):
+    """Construit le masque combiné des lignes à supprimer et les décomptes par règle
+
+    Toutes les règles (doublons et valeurs aberrantes) sont évaluées sur le
+    DataFrame brut puis combinées en un seul masque, appliqué une seule fois.
+    Les doublons sont repérés par empreinte de ligne, y compris par rapport
+    aux lignes déjà vues par `dedup`.
+    """
+    duplicates = ~(dedup if dedup is not None else Deduplicator()).new_rows(df)
+    counts = {'doublons': int(duplicates.sum())}
+
+    total_stay = df['stays_in_weekend_nights'] + df['stays_in_week_nights']
+    total_people = df['adults'] + df['children'].fillna(0) + df['babies']
+
+    outliers = np.zeros(len(df), dtype=bool)
+    for name, rule in OUTLIER_RULES.items():
+        mask = rule(df, total_people, total_stay).to_numpy() & ~duplicates
+        counts[name] = int(mask.sum())
+        outliers |= mask
+
+    counts['valeurs_aberrantes'] = int(outliers.sum())
+    return duplicates | outliers, counts
+
+
+def add_calendar_columns(df):
+    """Ajoute les colonnes calendaires dérivées de la date d'arrivée
+
+    Le mois devient une catégorie ordonnée (janvier à décembre) ; son code
+    donne directement le numéro du mois, sans analyser chaque ligne. Sont
+    ajoutés : arrival_month_num (int8), arrival_year_month (int32, année * 12
+    + mois - 1) et arrival_date (datetime64).
+    """
+    month = df['arrival_date_month']
+    if isinstance(month.dtype, pd.CategoricalDtype):
+        month = month.cat.set_categories(MONTH_NAMES, ordered=True)
+    else:
+        month = month.astype(MONTH_DTYPE)
+    df['arrival_date_month'] = month
+
+    month_num = month.cat.codes.to_numpy().astype(np.int8) + 1
+    year_month = df['arrival_date_year'].to_numpy().astype(np.int32) * 12 + month_num - 1
+    df['arrival_month_num'] = month_num
+    df['arrival_year_month'] = year_month
+    days = df['arrival_date_day_of_month'].to_numpy().astype('timedelta64[D]') - np.timedelta64(1, 'D')
+    df['arrival_date'] = (year_month - 1970 * 12).astype('datetime64[M]').astype('datetime64[D]') + days
+    return df
+
+
+def clean_data(df, inplace=False, return_counts=False, dedup=None):
+    """Nettoie et prépare les données pour l'analyse
+
+    Avec inplace=True, le DataFrame fourni est modifié directement, sans copie
+    (son index doit être unique). Avec return_counts=True, retourne aussi le
+    nombre de lignes supprimées par règle. Un Deduplicator partagé (`dedup`)
+    supprime aussi les doublons de lignes vues dans d'autres blocs ou fichiers.
+    """
+    drop, counts = _drop_mask(df, dedup)
 
-def clean_data(df):
-    """Nettoie et prépare les données pour l'analyse"""
     print("   • Suppression des doublons...")
-    initial_rows = len(df)
-    df = df.drop_duplicates()
-    print(f"     {initial_rows - len(df)} doublons supprimés")
+    print(f"     {counts['doublons']} doublons supprimés")
+    if inplace:
+        df.drop(index=df.index[drop], inplace=True)
+    else:
+        df = df.take(np.flatnonzero(~drop))
     
     print("   • Gestion des valeurs manquantes...")
     df['children'] = df['children'].fillna(0)
-    df['country'] = df['country'].fillna('Unknown')
+    if isinstance(df['country'].dtype, pd.CategoricalDtype) and UNKNOWN_COUNTRY not in df['country'].cat.categories:
+        df['country'] = df['country'].cat.add_categories(UNKNOWN_COUNTRY)
+    df['country'] = df['country'].fillna(UNKNOWN_COUNTRY)
     df['agent'] = df['agent'].fillna(0).astype(int)
     df['company'] = df['company'].fillna(0).astype(int)
     
     print("   • Conversion des types de données...")
-    df['reservation_status_date'] = pd.to_datetime(df['reservation_status_date'])
-    
-    categorical_cols = ['hotel', 'meal', 'country', 'market_segment', 
-                       'distribution_channel', 'reserved_room_type', 
-                       'assigned_room_type', 'deposit_type', 'customer_type',
-                       'reservation_status']
+    df['reservation_status_date'] = pd.to_datetime(df['reservation_status_date'], format='%Y-%m-%d')
     
-    for col in categorical_cols:
+    for col in CATEGORICAL_COLUMNS:
         if col in df.columns:
             df[col] = df[col].astype('category')
     
     print("   • Calcul de nouvelles variables...")
+    add_calendar_columns(df)
     df['total_stay'] = df['stays_in_weekend_nights'] + df['stays_in_week_nights']
     df['total_people'] = df['adults'] + df['children'] + df['babies']
     df['total_revenue'] = df['adr'] * df['total_stay']
     
     print("   • Suppression des valeurs aberrantes...")
-    initial_rows = len(df)
-    df = df[df['adr'] >= 0]
-    df = df[df['adr'] < 10000]
-    df = df[df['total_people'] > 0]
-    df = df[df['total_stay'] > 0]
-    print(f"     {initial_rows - len(df)} lignes avec valeurs aberrantes supprimées")
+    for name in OUTLIER_RULES:
+        print(f"     - {name}: {counts[name]} lignes")
+    print(f"     {counts['valeurs_aberrantes']} lignes avec valeurs aberrantes supprimées")
     
+    if return_counts:
+        return df, counts
     return df
 
 
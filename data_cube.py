@@ -0,0 +1,106 @@
+"""
+Cube d'agrégats (hôtel × année × mois × type de client) pour le tableau de bord
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import MONTH_NAMES, MONTH_NUMBERS
+
+CUBE_DIMENSIONS = ['hotel', 'arrival_date_year', 'arrival_month_num', 'customer_type']
+
+# Mesures additives : toute sélection se calcule en sommant les cellules du cube
+CUBE_MEASURES = {
+    'bookings': ('is_canceled', 'size'),
+    'canceled': ('is_canceled', 'sum'),
+    'adr_sum': ('adr', 'sum'),
+    'stay_sum': ('total_stay', 'sum'),
+    'lead_time_sum': ('lead_time', 'sum'),
+}
+
+
+def build_cube(df):
+    """Agrège les réservations au grain (hôtel, année, mois, type de client)"""
+    cube = df.groupby(CUBE_DIMENSIONS, observed=True).agg(**CUBE_MEASURES).reset_index()
+    for measure in CUBE_MEASURES:
+        cube[measure] = cube[measure].astype('float64' if measure.endswith('_sum') else 'int64')
+    cube['hotel'] = cube['hotel'].astype(str)
+    cube['customer_type'] = cube['customer_type'].astype(str)
+    return cube
+
+
+def slice_cube(cube, hotels=None, years=None, months=None):
+    """Sélectionne les cellules du cube correspondant aux filtres
+
+    Les mois sont donnés par leur nom anglais, comme dans le fichier source.
+    Un filtre à None n'est pas appliqué.
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    if hotels is not None:
+        mask &= cube['hotel'].isin(list(hotels)).to_numpy()
+    if years is not None:
+        mask &= cube['arrival_date_year'].isin(list(years)).to_numpy()
+    if months is not None:
+        month_nums = [MONTH_NUMBERS[m] for m in months]
+        mask &= cube['arrival_month_num'].isin(month_nums).to_numpy()
+    return cube[mask]
+
+
+def _ratios(totals):
+    """Calcule les moyennes à partir des sommes agrégées"""
+    bookings = totals['bookings'].replace(0, np.nan)
+    return pd.DataFrame({
+        'bookings': totals['bookings'],
+        'cancellation_rate': totals['canceled'] / bookings,
+        'avg_adr': totals['adr_sum'] / bookings,
+        'avg_stay': totals['stay_sum'] / bookings,
+        'avg_lead_time': totals['lead_time_sum'] / bookings,
+    })
+
+
+def cube_kpis(cube_slice):
+    """Indicateurs globaux d'une sélection du cube"""
+    totals = cube_slice[list(CUBE_MEASURES)].sum().to_frame().T
+    kpis = _ratios(totals).iloc[0]
+    return {
+        'total_bookings': int(kpis['bookings']),
+        'cancellation_rate': kpis['cancellation_rate'],
+        'avg_adr': kpis['avg_adr'],
+        'avg_stay': kpis['avg_stay'],
+        'avg_lead_time': kpis['avg_lead_time'],
+    }
+
+
+def cube_by_hotel(cube_slice):
+    """Indicateurs par type d'hôtel d'une sélection du cube"""
+    totals = cube_slice.groupby('hotel')[list(CUBE_MEASURES)].sum()
+    return _ratios(totals)
+
+
+def cube_quarterly(cube_slice):
+    """Indicateurs par hôtel, année et trimestre, avec le détail de chaque mois
+
+    Un seul regroupement au grain (hôtel, année, trimestre, mois) ; les
+    trimestres sont obtenus en sommant ses lignes. Retourne (trimestres, mois).
+    """
+    keys = ['hotel', 'arrival_date_year', 'quarter']
+    cube_slice = cube_slice.assign(quarter=(cube_slice['arrival_month_num'] - 1) // 3 + 1)
+    monthly = cube_slice.groupby(keys + ['arrival_month_num'])[list(CUBE_MEASURES)].sum()
+    quarterly = monthly.groupby(level=keys).sum()
+    return _ratios(quarterly), _ratios(monthly)
+
+
+def cube_monthly(cube_slice):
+    """Nombre de réservations par année, mois et type d'hôtel"""
+    monthly = (cube_slice
+               .groupby(['arrival_date_year', 'arrival_month_num', 'hotel'])['bookings']
+               .sum()
+               .reset_index(name='count'))
+    monthly['arrival_date_month'] = [MONTH_NAMES[m - 1] for m in monthly['arrival_month_num']]
+    return monthly
+
+
+def cube_customer_types(cube_slice):
+    """Tableau croisé du nombre de réservations par hôtel et type de client"""
+    return cube_slice.pivot_table(index='hotel', columns='customer_type',
+                                  values='bookings', aggfunc='sum', fill_value=0)
@@ -0,0 +1,122 @@
+"""
+Chargement des données de réservations hôtelières
+"""
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+DATA_PATH = 'data/hotel_bookings.csv'
+
+# Schéma explicite du fichier hotel_bookings.csv : évite l'inférence des types
+# et réduit l'empreinte mémoire (catégories pour les chaînes, petits entiers
+# pour les compteurs). Les colonnes pouvant contenir des valeurs manquantes
+# (children, agent, company) restent en flottants jusqu'au nettoyage.
+BOOKING_DTYPES = {
+    'hotel': 'category',
+    'is_canceled': 'int8',
+    'lead_time': 'int16',
+    'arrival_date_year': 'int16',
+    'arrival_date_month': 'category',
+    'arrival_date_week_number': 'int8',
+    'arrival_date_day_of_month': 'int8',
+    'stays_in_weekend_nights': 'int16',
+    'stays_in_week_nights': 'int16',
+    'adults': 'int16',
+    'children': 'float32',
+    'babies': 'int8',
+    'meal': 'category',
+    'country': 'category',
+    'market_segment': 'category',
+    'distribution_channel': 'category',
+    'is_repeated_guest': 'int8',
+    'previous_cancellations': 'int16',
+    'previous_bookings_not_canceled': 'int16',
+    'reserved_room_type': 'category',
+    'assigned_room_type': 'category',
+    'booking_changes': 'int16',
+    'deposit_type': 'category',
+    'agent': 'float32',
+    'company': 'float32',
+    'days_in_waiting_list': 'int16',
+    'customer_type': 'category',
+    'adr': 'float64',
+    'required_car_parking_spaces': 'int8',
+    'total_of_special_requests': 'int8',
+    'reservation_status': 'category',
+}
+
+DATE_COLUMNS = ['reservation_status_date']
+DATE_FORMAT = '%Y-%m-%d'
+
+DEFAULT_CHUNKSIZE = 500_000
+
+
+def read_csv_kwargs(usecols=None):
+    """Construit les arguments de lecture communs pour le schéma des réservations"""
+    dtypes = BOOKING_DTYPES
+    parse_dates = DATE_COLUMNS
+    if usecols is not None:
+        dtypes = {col: dtype for col, dtype in BOOKING_DTYPES.items() if col in usecols}
+        parse_dates = [col for col in DATE_COLUMNS if col in usecols]
+    return {
+        'dtype': dtypes,
+        'usecols': usecols,
+        'parse_dates': parse_dates,
+        'date_format': DATE_FORMAT,
+    }
+
+
+def load_data(path=DATA_PATH, usecols=None):
+    """Charge le fichier de réservations avec le schéma explicite"""
+    return pd.read_csv(path, **read_csv_kwargs(usecols))
+
+
+def iter_chunks(path=DATA_PATH, chunksize=DEFAULT_CHUNKSIZE, usecols=None):
+    """Itère sur le fichier de réservations par blocs de `chunksize` lignes"""
+    with pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs(usecols)) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def concat_chunks(chunks):
+    """Concatène des blocs en conservant les colonnes catégorielles
+
+    Chaque bloc lu avec le type 'category' possède ses propres catégories :
+    une concaténation directe les convertirait en objets Python. Les
+    catégories sont donc unifiées colonne par colonne.
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+
+    categorical_cols = [col for col, dtype in chunks[0].dtypes.items()
+                        if isinstance(dtype, pd.CategoricalDtype)]
+    for col in categorical_cols:
+        categories = union_categoricals([chunk[col] for chunk in chunks],
+                                        ignore_order=True).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_clean_data_chunked(path=DATA_PATH, chunksize=DEFAULT_CHUNKSIZE, usecols=None):
+    """Charge et nettoie le fichier bloc par bloc pour borner la mémoire
+
+    Seuls les blocs nettoyés (plus petits que les blocs bruts) sont conservés
+    en mémoire. Les empreintes des lignes vues sont partagées entre les blocs :
+    un doublon est supprimé même si sa première occurrence est dans un autre
+    bloc, et le résultat est celui d'un chargement en une fois.
+    """
+    from data_cleaning import clean_data
+    from deduplication import Deduplicator
+
+    dedup = Deduplicator()
+    cleaned = []
+    for i, chunk in enumerate(iter_chunks(path, chunksize, usecols), start=1):
+        print(f"   • Bloc {i}: {len(chunk)} lignes")
+        cleaned.append(clean_data(chunk, inplace=True, dedup=dedup))
+    print(f"   • {dedup.dropped} doublons supprimés au total")
+    return concat_chunks(cleaned)
@@ -0,0 +1,188 @@
+"""
+Suppression des doublons par empreintes de lignes 64 bits (bloc par bloc)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Constantes du mélange splitmix64
+_MIX_1 = np.uint64(0xbf58476d1ce4e5b9)
+_MIX_2 = np.uint64(0x94d049bb133111eb)
+_COLUMN_SEED = np.uint64(0x9e3779b97f4a7c15)
+_MISSING = np.uint64(0x7ff8dead7ff8dead)
+
+
+def _mix(values):
+    """Mélange splitmix64 : chaque bit d'entrée influence tous les bits de sortie"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * _MIX_1
+    values = values ^ (values >> np.uint64(27))
+    values = values * _MIX_2
+    return values ^ (values >> np.uint64(31))
+
+
+def _column_hashes(series):
+    """Valeur 64 bits de chaque ligne d'une colonne, indépendante du découpage en blocs
+
+    Les nombres sont comparés par valeur (convertis en float64, si bien qu'un
+    entier et le flottant égal coïncident), les dates par leur horodatage et
+    les catégories par leur libellé : seuls les libellés distincts sont
+    hachés, puis distribués par leurs codes. Les valeurs manquantes ont
+    toutes la même empreinte.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        codes = series.cat.codes.to_numpy()
+        if not len(categories):
+            # Bloc entièrement manquant : aucun libellé à indexer
+            return np.full(len(codes), _MISSING)
+        label_hashes = pd.util.hash_array(categories.astype(str).to_numpy(dtype=object))
+        return np.where(codes >= 0, label_hashes[codes], _MISSING)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        values = series.to_numpy(dtype='datetime64[ns]')
+        return np.where(np.isnat(values), _MISSING, values.view(np.int64).view(np.uint64))
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0  # -0.0 devient 0.0
+        return np.where(np.isnan(values), _MISSING, values.view(np.uint64))
+    values = series.to_numpy(dtype=object)
+    return np.where(pd.isna(values), _MISSING, pd.util.hash_array(values.astype(str)))
+
+
+def row_fingerprints(df):
+    """Empreinte 64 bits de chaque ligne, calculée colonne par colonne
+
+    Les colonnes sont combinées dans l'ordre alphabétique de leur nom : deux
+    lignes de mêmes valeurs ont la même empreinte, quel que soit le bloc ou
+    le fichier d'où elles proviennent.
+    """
+    fingerprints = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for position, col in enumerate(sorted(df.columns), start=1):
+            column = _mix(_column_hashes(df[col]) + _COLUMN_SEED * np.uint64(position))
+            fingerprints = _mix(fingerprints * np.uint64(31) + column)
+    return fingerprints
+
+
+class Deduplicator:
+    """Ensemble des empreintes déjà vues, partagé entre blocs et fichiers
+
+    Les empreintes sont conservées en séries triées dont les tailles
+    décroissent au moins de moitié de l'une à la suivante : chaque recherche
+    est une dichotomie par série, et les fusions restent amorties en
+    O(n log n). 8 octets par réservation, quelle que soit la largeur des lignes.
+    Chaque série est enregistrée dans son propre fichier : sauvegarder
+    n'écrit que les séries nouvelles ou issues d'une fusion.
+    """
+
+    def __init__(self, fingerprints=None):
+        self._runs = []
+        # Fichier de chaque série (None : pas encore enregistrée)
+        self._files = []
+        if fingerprints is not None and len(fingerprints):
+            self._runs.append(fingerprints)
+            self._files.append(None)
+        self.dropped = 0
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, fingerprints):
+        """Masque des empreintes déjà vues"""
+        seen = np.zeros(len(fingerprints), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, fingerprints)
+            found = positions < len(run)
+            found[found] = run[positions[found]] == fingerprints[found]
+            seen |= found
+        return seen
+
+    def _add(self, fingerprints):
+        run = np.sort(fingerprints)
+        while self._runs and len(self._runs[-1]) <= 2 * len(run):
+            run = np.union1d(self._runs.pop(), run)
+            self._files.pop()
+        self._runs.append(run)
+        self._files.append(None)
+
+    def new_rows(self, df):
+        """Masque des lignes jamais vues (première occurrence) ; les retient comme vues"""
+        fingerprints = row_fingerprints(df)
+        _, first = np.unique(fingerprints, return_index=True)
+        new = np.zeros(len(df), dtype=bool)
+        new[first] = True
+        new[first] = ~self.contains(fingerprints[first])
+        if new.any():
+            self._add(fingerprints[new])
+        self.dropped += len(df) - int(new.sum())
+        return new
+
+    def fingerprints(self):
+        """Toutes les empreintes vues, triées (fusionne toutes les séries en une)"""
+        if len(self._runs) != 1:
+            merged = np.sort(np.concatenate(self._runs)) if self._runs else np.empty(0, np.uint64)
+            self._runs, self._files = ([merged], [None]) if len(merged) else ([], [])
+        return self._runs[0] if self._runs else np.empty(0, dtype=np.uint64)
+
+    def save(self, directory):
+        """Enregistre les séries non encore écrites (un .npy par série)
+
+        Les séries déjà enregistrées ne sont pas réécrites : le coût d'une
+        sauvegarde est celui des empreintes ajoutées (et des fusions qu'elles
+        ont déclenchées). Aucun fichier n'est supprimé ; retourne les noms des
+        fichiers des séries courantes, à passer à load puis à prune. Le
+        compteur de doublons n'est pas conservé.
+        """
+        os.makedirs(directory, exist_ok=True)
+        existing = [int(name[4:-4]) for name in os.listdir(directory) if _is_run_file(name)]
+        number = max(existing, default=0)
+        for i, run in enumerate(self._runs):
+            if self._files[i] is None:
+                number += 1
+                path = os.path.join(directory, f'run_{number:06d}.npy')
+                tmp_path = path + '.tmp.npy'
+                np.save(tmp_path, run)
+                os.replace(tmp_path, path)
+                self._files[i] = path
+        return [os.path.basename(path) for path in self._files]
+
+    def prune(self, directory):
+        """Supprime les fichiers de séries qui ne sont plus des séries courantes
+
+        Fichiers des séries fusionnées depuis, ou écrits par une sauvegarde
+        interrompue avant d'être référencés.
+        """
+        if not os.path.isdir(directory):
+            return
+        current = {os.path.basename(path) for path in self._files if path is not None}
+        for name in os.listdir(directory):
+            if _is_run_file(name) and name not in current:
+                os.remove(os.path.join(directory, name))
+
+    @classmethod
+    def load(cls, directory, names=None):
+        """Recharge les séries enregistrées, projetées en mémoire
+
+        Seules les pages touchées par les recherches sont lues : dédoublonner
+        de nouvelles lignes ne relit pas tout l'historique. `names` limite le
+        chargement aux fichiers listés (retournés par save) ; les autres
+        fichiers du répertoire sont ignorés.
+        """
+        dedup = cls()
+        if not os.path.isdir(directory):
+            return dedup
+        # Les séries sont numérotées dans l'ordre de leur création, donc de
+        # taille décroissante
+        if names is None:
+            names = sorted(name for name in os.listdir(directory) if _is_run_file(name))
+        for name in names:
+            path = os.path.join(directory, name)
+            dedup._runs.append(np.load(path, mmap_mode='r'))
+            dedup._files.append(path)
+        return dedup
+
+
+def _is_run_file(name):
+    return name.startswith('run_') and name.endswith('.npy') and name[4:-4].isdigit()
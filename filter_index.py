@@ -0,0 +1,94 @@
+"""
+Index de filtrage par codes entiers et bitmaps pour le tableau de bord
+"""
+
+import numpy as np
+import pandas as pd
+
+FILTER_DIMENSIONS = ['hotel', 'arrival_date_year', 'arrival_date_month',
+                     'market_segment', 'country', 'deposit_type']
+
+# Au-delà de ce nombre de valeurs distinctes, une dimension est indexée par
+# listes d'identifiants de lignes plutôt que par un bitmap par valeur
+# (un bitmap coûte n/8 octets quelle que soit la fréquence de la valeur).
+MAX_BITMAP_VALUES = 32
+
+
+class FilterIndex:
+    """Index construit une seule fois au chargement des données
+
+    Chaque dimension est encodée en codes entiers. Pour chaque valeur, l'index
+    conserve soit un bitmap compressé (np.packbits), soit la liste triée des
+    lignes correspondantes. Une sélection se résout par OU entre les valeurs
+    d'une dimension puis ET entre dimensions, sans comparer de chaînes.
+    """
+
+    def __init__(self, df, dimensions=FILTER_DIMENSIONS):
+        self.n_rows = len(df)
+        self.dimensions = [dim for dim in dimensions if dim in df.columns]
+        self.values = {}
+        self.bitmaps = {}
+        self.row_ids = {}
+
+        for dim in self.dimensions:
+            codes, uniques = pd.factorize(df[dim], sort=True)
+            self.values[dim] = list(uniques)
+            if len(uniques) <= MAX_BITMAP_VALUES:
+                self.bitmaps[dim] = [np.packbits(codes == k) for k in range(len(uniques))]
+            else:
+                order = np.argsort(codes, kind='stable').astype(np.int64)
+                bounds = np.cumsum(np.bincount(codes[codes >= 0], minlength=len(uniques)))
+                n_missing = int((codes < 0).sum())
+                self.row_ids[dim] = np.split(order[n_missing:], bounds[:-1])
+
+    def _dimension_bitmap(self, dim, selected):
+        """Bitmap compressé des lignes dont la dimension prend une des valeurs choisies"""
+        positions = {value: i for i, value in enumerate(self.values[dim])}
+        codes = [positions[value] for value in selected if value in positions]
+
+        if dim in self.bitmaps:
+            bitmap = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for code in codes:
+                bitmap |= self.bitmaps[dim][code]
+            return bitmap
+
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for code in codes:
+            mask[self.row_ids[dim][code]] = True
+        return np.packbits(mask)
+
+    def select(self, **filters):
+        """Retourne les positions des lignes correspondant aux filtres
+
+        Chaque filtre associe une dimension à l'ensemble des valeurs retenues ;
+        une dimension absente, à None, ou dont toutes les valeurs sont retenues
+        n'est pas filtrée.
+        """
+        result = None
+        for dim, selected in filters.items():
+            if selected is None:
+                continue
+            selected = set(selected)
+            if selected.issuperset(self.values[dim]):
+                continue
+            bitmap = self._dimension_bitmap(dim, selected)
+            result = bitmap if result is None else result & bitmap
+
+        if result is None:
+            return np.arange(self.n_rows)
+        return np.flatnonzero(np.unpackbits(result, count=self.n_rows))
+
+    def is_restricted(self, dim, selected):
+        """Indique si une sélection exclut au moins une valeur de la dimension"""
+        return selected is not None and not set(selected).issuperset(self.values[dim])
+
+    @staticmethod
+    def take(df, rows):
+        """Vue des lignes sélectionnées
+
+        Les positions étant triées et uniques, une sélection de toutes les
+        lignes est le DataFrame lui-même, retourné sans copie.
+        """
+        if len(rows) == len(df):
+            return df
+        return df.take(rows)
@@ -1,45 +1,29 @@
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle, Image
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
-import pandas as pd
+import argparse
 import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chart_cache import cached_charts
+from data_cleaning import MONTH_NAMES
+from data_cube import cube_kpis, cube_quarterly, slice_cube
+from data_loading import DATA_PATH
+from occupancy import OCCUPANCY_COLUMNS, build_calendar, monthly_occupancy
+from partitioned_store import ensure_store, read_partition_stats
+import profiling
+from profiling import span
+from shared_dataset import open_shared
+
+REPORT_PATH = 'rapport.pdf'
+BATCH_DIR = 'output/rapports'
+
+
+def _report_styles():
+    """Styles de paragraphe communs aux rapports"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 
-def generate_rapport():
-    # Charger les données pour les statistiques
-    df = pd.read_csv('data/hotel_bookings.csv')
-    df_clean = df.copy()
-    df_clean = df_clean.drop_duplicates()
-    df_clean['children'] = df_clean['children'].fillna(0)
-    df_clean['country'] = df_clean['country'].fillna('Unknown')
-    df_clean['agent'] = df_clean['agent'].fillna(0).astype(int)
-    df_clean['company'] = df_clean['company'].fillna(0).astype(int)
-    df_clean['total_stay'] = df_clean['stays_in_weekend_nights'] + df_clean['stays_in_week_nights']
-    df_clean['total_people'] = df_clean['adults'] + df_clean['children'] + df_clean['babies']
-    df_clean = df_clean[df_clean['adr'] >= 0]
-    df_clean = df_clean[df_clean['adr'] < 10000]
-    df_clean = df_clean[df_clean['total_people'] > 0]
-    df_clean = df_clean[df_clean['total_stay'] > 0]
-    
-    # Calculer les statistiques
-    total_bookings = len(df_clean)
-    cancellation_rate = df_clean['is_canceled'].mean() * 100
-    avg_adr = df_clean['adr'].mean()
-    avg_stay = df_clean['total_stay'].mean()
-    
-    city_bookings = len(df_clean[df_clean['hotel'] == 'City Hotel'])
-    resort_bookings = len(df_clean[df_clean['hotel'] == 'Resort Hotel'])
-    city_cancel_rate = df_clean[df_clean['hotel'] == 'City Hotel']['is_canceled'].mean() * 100
-    resort_cancel_rate = df_clean[df_clean['hotel'] == 'Resort Hotel']['is_canceled'].mean() * 100
-    city_adr = df_clean[df_clean['hotel'] == 'City Hotel']['adr'].mean()
-    resort_adr = df_clean[df_clean['hotel'] == 'Resort Hotel']['adr'].mean()
-    
-    # Créer le PDF
-    filename = "rapport.pdf"
-    doc = SimpleDocTemplate(filename, pagesize=A4)
-    story = []
     styles = getSampleStyleSheet()
     
     # Style personnalisé pour le titre
@@ -70,6 +54,78 @@ def generate_rapport():
         alignment=TA_JUSTIFY,
         spaceAfter=12
     )
+    return styles, title_style, heading_style, body_style
+
+
+def _stats_table(data, col_widths):
+    """Tableau de statistiques avec en-tête coloré"""
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(data, colWidths=col_widths)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ]))
+    return table
+
+
+def _chart_images(charts, width, max_height):
+    """Images des graphiques en cache, mises à l'échelle de la page, avec leur légende"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image, KeepTogether, Paragraph
+
+    caption_style = getSampleStyleSheet()['Italic']
+    flowables = []
+    for label, path in charts:
+        pixel_width, pixel_height = ImageReader(path).getSize()
+        scale = min(width / pixel_width, max_height / pixel_height)
+        image = Image(path, width=pixel_width * scale, height=pixel_height * scale)
+        flowables.append(KeepTogether([image, Paragraph(label, caption_style)]))
+    return flowables
+
+
+def generate_rapport(path=DATA_PATH, filename=REPORT_PATH):
+    # reportlab n'est chargé que lorsqu'un rapport est effectivement généré
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+
+    # Statistiques calculées à partir du résumé des partitions (aucune ligne lue)
+    with span('stats'):
+        cube = read_partition_stats(ensure_store(path))
+        kpis = cube_kpis(cube)
+        city = cube_kpis(slice_cube(cube, hotels=['City Hotel']))
+        resort = cube_kpis(slice_cube(cube, hotels=['Resort Hotel']))
+
+    # Occupation par nuit : séjours répartis sur leurs nuits (tableaux de différences)
+    with span('occupancy'):
+        occupancy = monthly_occupancy(build_calendar(open_shared(path).frame(OCCUPANCY_COLUMNS)).daily())
+
+    total_bookings = kpis['total_bookings']
+    cancellation_rate = kpis['cancellation_rate'] * 100
+    avg_adr = kpis['avg_adr']
+    avg_stay = kpis['avg_stay']
+    
+    city_bookings = city['total_bookings']
+    resort_bookings = resort['total_bookings']
+    city_cancel_rate = city['cancellation_rate'] * 100
+    resort_cancel_rate = resort['cancellation_rate'] * 100
+    city_adr = city['avg_adr']
+    resort_adr = resort['avg_adr']
+    
+    # Créer le PDF
+    doc = SimpleDocTemplate(filename, pagesize=A4)
+    story = []
+    styles, title_style, heading_style, body_style = _report_styles()
     
     # Titre
     story.append(Paragraph("Analyse Exploratoire de la Demande Hôtelière", title_style))
@@ -139,25 +195,41 @@ def generate_rapport():
         ['Nombre de réservations', f'{city_bookings:,}', f'{resort_bookings:,}', f'{total_bookings:,}'],
         ['Taux d\'annulation (%)', f'{city_cancel_rate:.2f}%', f'{resort_cancel_rate:.2f}%', f'{cancellation_rate:.2f}%'],
         ['Prix moyen (ADR)', f'${city_adr:.2f}', f'${resort_adr:.2f}', f'${avg_adr:.2f}'],
-        ['Durée moyenne séjour', f'{df_clean[df_clean["hotel"]=="City Hotel"]["total_stay"].mean():.1f} nuits',
-         f'{df_clean[df_clean["hotel"]=="Resort Hotel"]["total_stay"].mean():.1f} nuits', f'{avg_stay:.1f} nuits']
+        ['Durée moyenne séjour', f'{city["avg_stay"]:.1f} nuits',
+         f'{resort["avg_stay"]:.1f} nuits', f'{avg_stay:.1f} nuits']
     ]
     
-    table = Table(data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-    ]))
+    table = _stats_table(data, [2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
     story.append(table)
     story.append(Spacer(1, 0.3*inch))
     
+    # Occupation mensuelle
+    story.append(Paragraph("Occupation Mensuelle", heading_style))
+    story.append(Paragraph(
+        "Les réservations non annulées sont réparties sur chacune des nuits de leur séjour : nuitées, chambres "
+        "occupées par nuit (moyenne et pic du mois) et revenu des nuits du mois, au prix moyen journalier de chaque séjour.",
+        body_style
+    ))
+    data = [['Mois', 'Hôtel', 'Nuitées', 'Chambres / nuit', 'Pic', 'Revenu']]
+    for row in occupancy.itertuples(index=False):
+        data.append([f'{MONTH_NAMES[row.month.month - 1]} {row.month.year}', row.hotel, f'{row.room_nights:,}',
+                     f'{row.avg_rooms:.0f}', f'{row.peak_rooms:,}', f'${row.revenue:,.0f}'])
+    story.append(_stats_table(data, [1.4*inch, 1.2*inch, 0.9*inch, 1.1*inch, 0.7*inch, 1.2*inch]))
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Graphiques repris du cache de main.py (aucun rendu ici)
+    charts = cached_charts(path)
+    if charts:
+        story.append(PageBreak())
+        story.append(Paragraph("Graphiques", heading_style))
+        for flowable in _chart_images(charts, 6*inch, 4.2*inch):
+            story.append(flowable)
+            story.append(Spacer(1, 0.2*inch))
+        story.append(PageBreak())
+    else:
+        print("Graphiques absents du cache pour ces données : exécuter "
+              "'python3 main.py charts' pour les inclure au rapport")
+    
     # Limites
     story.append(Paragraph("Limites des Données", heading_style))
     story.append(Paragraph(
@@ -190,9 +262,124 @@ def generate_rapport():
         body_style
     ))
     
-    doc.build(story)
-    print(f"Rapport PDF généré : {filename}")
+    with span('build_pdf'):
+        doc.build(story)
+    print(f"Rapport PDF généré : {filename} ({len(charts)} graphiques)")
 
-if __name__ == "__main__":
-    generate_rapport()
 
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+def report_jobs(path=DATA_PATH, output_dir=BATCH_DIR):
+    """Prépare un rapport par hôtel × année × trimestre
+
+    Les indicateurs de toutes les tranches viennent d'un seul regroupement du
+    résumé des partitions (cube_quarterly). Chaque tâche porte son chemin de
+    sortie, son libellé et ses indicateurs : elle peut être transmise telle
+    quelle à un autre processus.
+    """
+    quarterly, monthly = cube_quarterly(read_partition_stats(ensure_store(path)))
+    months_by_slice = {key: group.droplevel(list(range(3)))
+                       for key, group in monthly.groupby(level=[0, 1, 2])}
+    jobs = []
+    for (hotel, year, quarter), row in quarterly.iterrows():
+        months = months_by_slice[(hotel, year, quarter)]
+        jobs.append({
+            'path': os.path.join(output_dir, f"rapport_{_slug(hotel)}_{year}_T{quarter}.pdf"),
+            'label': f"{hotel} — T{quarter} {year}",
+            'kpis': row.to_dict(),
+            'months': [(MONTH_NAMES[month - 1], int(m['bookings']), float(m['cancellation_rate']),
+                        float(m['avg_adr']), float(m['avg_stay']))
+                       for month, m in months.iterrows()],
+        })
+    return jobs
+
+
+def _preload_reportlab():
+    """Initialisation des processus : importe reportlab une fois par processus"""
+    import reportlab.platypus  # noqa: F401
+
+
+def build_slice_report(job):
+    """Construit le PDF d'une tranche et retourne la durée de construction"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    start = time.perf_counter()
+    styles, title_style, heading_style, body_style = _report_styles()
+    kpis = job['kpis']
+    story = [
+        Paragraph("Rapport Trimestriel de la Demande Hôtelière", title_style),
+        Paragraph(job['label'], styles['Heading2']),
+        Spacer(1, 0.2*inch),
+        Paragraph("Indicateurs du Trimestre", heading_style),
+        Paragraph(
+            f"Ce trimestre compte {int(kpis['bookings']):,} réservations, avec un taux d'annulation de "
+            f"{kpis['cancellation_rate'] * 100:.2f}%, un prix moyen de ${kpis['avg_adr']:.2f} et une durée "
+            f"moyenne de séjour de {kpis['avg_stay']:.1f} nuits. Le délai moyen de réservation est de "
+            f"{kpis['avg_lead_time']:.0f} jours.",
+            body_style
+        ),
+        Paragraph("Détail Mensuel", heading_style),
+    ]
+    data = [['Mois', 'Réservations', 'Annulation (%)', 'Prix moyen (ADR)', 'Durée moyenne']]
+    for month, bookings, cancel_rate, adr, stay in job['months']:
+        data.append([month, f'{bookings:,}', f'{cancel_rate * 100:.2f}%', f'${adr:.2f}', f'{stay:.1f} nuits'])
+    story.append(_stats_table(data, [1.3*inch, 1.2*inch, 1.3*inch, 1.5*inch, 1.3*inch]))
+
+    SimpleDocTemplate(job['path'], pagesize=A4).build(story)
+    return time.perf_counter() - start
+
+
+def generate_batch(path=DATA_PATH, output_dir=BATCH_DIR, n_workers=1):
+    """Génère un rapport PDF par hôtel × année × trimestre
+
+    Avec n_workers > 1, les PDF sont construits dans un pool de processus.
+    Affiche le débit en rapports par seconde et retourne les chemins écrits.
+    """
+    start = time.perf_counter()
+    with span('slice_metrics'):
+        jobs = report_jobs(path, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with span('build_pdfs'):
+        if n_workers and n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_preload_reportlab) as pool:
+                chunksize = max(1, len(jobs) // (n_workers * 4))
+                durations = list(pool.map(build_slice_report, jobs, chunksize=chunksize))
+        else:
+            durations = [build_slice_report(job) for job in jobs]
+
+    elapsed = time.perf_counter() - start
+    print(f"{len(jobs)} rapports générés dans {output_dir}/ en {elapsed:.2f} s "
+          f"({len(jobs) / elapsed:.1f} rapports/s, {sum(durations) / max(len(jobs), 1) * 1000:.0f} ms "
+          f"par PDF, {n_workers} processus)")
+    return [job['path'] for job in jobs]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération du rapport PDF")
+    parser.add_argument('--batch', action='store_true',
+                        help="Un rapport par hôtel, année et trimestre")
+    parser.add_argument('--output-dir', default=BATCH_DIR,
+                        help="Dossier des rapports du mode --batch")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour construire les PDF (mode --batch)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Mesurer temps, CPU et mémoire de chaque étape")
+    parser.add_argument('--profile-output', default='output/profile_rapport',
+                        help="Préfixe des fichiers de trace (.json et .csv)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+    with span('generate_rapport'):
+        if args.batch:
+            generate_batch(output_dir=args.output_dir, n_workers=args.workers)
+        else:
+            generate_rapport()
+    if args.profile:
+        profiling.write_report(profiling.disable(), args.profile_output,
+                               meta={'script': 'generate_rapport.py', 'batch': args.batch,
+                                     'workers': args.workers})
@@ -0,0 +1,105 @@
+"""
+Ingestion incrémentale de nouvelles réservations
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+from data_cache import CACHE_DIR
+from data_cleaning import clean_data
+from data_loading import DEFAULT_CHUNKSIZE, iter_chunks
+from deduplication import Deduplicator
+from stats_engine import BookingAggregates
+
+STATE_DIR = os.path.join(CACHE_DIR, 'incremental')
+STATE_FILE = 'aggregates.json'
+# Séries triées d'empreintes, un fichier .npy par série
+FINGERPRINTS_DIR = 'fingerprints'
+
+
+def load_state(state_dir=STATE_DIR):
+    """Charge l'état agrégé et les empreintes des réservations déjà ingérées
+
+    Seules les séries d'empreintes listées dans l'état sont chargées, et
+    elles sont projetées en mémoire plutôt que lues en entier.
+    """
+    state_path = os.path.join(state_dir, STATE_FILE)
+    if not os.path.exists(state_path):
+        return BookingAggregates(), Deduplicator()
+    with open(state_path, encoding='utf-8') as f:
+        data = json.load(f)
+    dedup = Deduplicator.load(os.path.join(state_dir, FINGERPRINTS_DIR), data['fingerprint_runs'])
+    return BookingAggregates.from_dict(data), dedup
+
+
+def save_state(state, dedup, state_dir=STATE_DIR):
+    """Enregistre l'état agrégé et les nouvelles séries d'empreintes
+
+    Les nouvelles séries sont écrites d'abord, puis l'état (avec la liste de
+    ses séries) remplace l'ancien d'un seul rename : c'est le point de
+    validation. Les séries qui n'y figurent plus ne sont supprimées qu'après.
+    Une interruption laisse l'ancien état complet ou le nouveau, jamais un
+    mélange des deux.
+    """
+    fingerprints_dir = os.path.join(state_dir, FINGERPRINTS_DIR)
+    os.makedirs(state_dir, exist_ok=True)
+    data = state.to_dict()
+    data['fingerprint_runs'] = dedup.save(fingerprints_dir)
+    path = os.path.join(state_dir, STATE_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+    dedup.prune(fingerprints_dir)
+
+
+def append_bookings(path, state_dir=STATE_DIR, chunksize=DEFAULT_CHUNKSIZE):
+    """Ingère un fichier de nouvelles réservations dans l'état persistant
+
+    Les lignes déjà ingérées (même empreinte, dans ce fichier ou un fichier
+    précédent) sont écartées avant le reste du nettoyage. Le coût est
+    proportionnel au nombre de nouvelles lignes, pas à la taille de l'historique.
+    """
+    state, dedup = load_state(state_dir)
+    added = BookingAggregates()
+
+    for chunk in iter_chunks(path, chunksize):
+        added.update(clean_data(chunk, inplace=True, dedup=dedup))
+
+    state.merge(added)
+    save_state(state, dedup, state_dir)
+    print(f"   • {added.total} nouvelles réservations ajoutées, {dedup.dropped} déjà connues ou en double")
+    return state
+
+
+def load_stats(state_dir=STATE_DIR):
+    """Statistiques calculées depuis l'état persistant"""
+    state, _ = load_state(state_dir)
+    return state.to_stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestion incrémentale de réservations")
+    parser.add_argument('files', nargs='*', help="Fichiers CSV de nouvelles réservations")
+    parser.add_argument('--reset', action='store_true',
+                        help="Réinitialiser l'état avant l'ingestion")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    if args.reset and os.path.exists(STATE_DIR):
+        shutil.rmtree(STATE_DIR)
+
+    for path in args.files:
+        print(f"Ingestion de {path}...")
+        append_bookings(path, chunksize=args.chunksize)
+
+    stats = load_stats()
+    print("\nStatistiques à jour:")
+    for key, value in stats.items():
+        print(f"  - {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
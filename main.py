@@ -1,64 +1,198 @@
 """
 Analyse des données de réservations hôtelières
+
+Interface en ligne de commande : chaque commande n'importe que les
+bibliothèques dont elle a besoin (matplotlib pour les graphiques, reportlab
+pour le rapport), si bien qu'un calcul de statistiques démarre rapidement.
 """
 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import importlib
+import sys
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
-try:
-    plt.style.use('seaborn-v0_8-darkgrid')
-except OSError:
-    plt.style.use('seaborn-darkgrid')
-sns.set_palette("husl")
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
+import profiling
+from profiling import span
 
-from data_cleaning import clean_data
-from data_analysis import analyze_data, visualize_data
+PROFILE_OUTPUT = 'output/profile'
 
+COMMANDS = {
+    'all': "statistiques et graphiques (par défaut)",
+    'clean': "nettoyer le fichier source et mettre à jour le cache",
+    'stats': "afficher les statistiques principales",
+    'charts': "générer les graphiques dans output/",
+    'report': "générer le rapport PDF",
+}
 
-def main():
-    print("=" * 60)
-    print("ANALYSE DES RÉSERVATIONS HÔTELIÈRES")
-    print("=" * 60)
-    print()
-    
+# Modules chargés par chaque commande, importés et chronométrés avant son
+# exécution : les bibliothèques d'abord, puis les modules du projet
+_DATA_IMPORTS = ['numpy', 'pyarrow', 'pandas', 'data_loading', 'data_cleaning',
+                 'memory_budget', 'data_cache']
+COMMAND_IMPORTS = {
+    'clean': _DATA_IMPORTS,
+    'stats': _DATA_IMPORTS + ['data_analysis'],
+    # matplotlib n'est importé que si un graphique doit être redessiné
+    'charts': _DATA_IMPORTS + ['data_analysis', 'chart_cache'],
+    'report': _DATA_IMPORTS + ['reportlab.platypus', 'partitioned_store', 'generate_rapport'],
+}
+COMMAND_IMPORTS['all'] = COMMAND_IMPORTS['charts']
+
+
+def import_modules(modules):
+    """Importe les modules dans l'ordre donné et retourne la durée de chaque import
+
+    Chaque durée n'inclut que ce qui n'avait pas encore été importé.
+    """
+    timings = []
+    for name in modules:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings.append((name, time.perf_counter() - start))
+    return timings
+
+
+def format_import_times(command, timings):
+    total = sum(seconds for _, seconds in timings)
+    lines = [f"Commande '{command}' : imports en {total * 1000:.0f} ms"]
+    for name, seconds in sorted(timings, key=lambda t: -t[1]):
+        lines.append(f"   • {name:<20} {seconds * 1000:>7.1f} ms")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analyse des réservations hôtelières",
+        epilog="Commandes : " + "; ".join(f"{name} = {text}" for name, text in COMMANDS.items()))
+    parser.add_argument('command', nargs='?', choices=list(COMMANDS), default='all',
+                        help="Commande à exécuter (défaut : all)")
+    parser.add_argument('--data', default=None,
+                        help="Chemin du fichier CSV des réservations")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Charger et nettoyer le fichier par blocs de N lignes")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignorer le cache des données nettoyées")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour le rendu des graphiques ou des rapports")
+    parser.add_argument('--batch', action='store_true',
+                        help="report : un rapport par hôtel, année et trimestre")
+    parser.add_argument('--memory-budget', type=float, default=None, metavar='MO',
+                        help="Ne garder que les colonnes utiles, afficher l'empreinte "
+                             "mémoire par colonne et la comparer au budget (Mo)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Mesurer temps, CPU et mémoire de chaque étape")
+    parser.add_argument('--profile-output', default=PROFILE_OUTPUT,
+                        help="Préfixe des fichiers de trace (.json et .csv)")
+    return parser.parse_args(argv)
+
+
+def _clean_source(args):
+    """Charge et nettoie le fichier source (Étape 2), puis met à jour le cache"""
+    from data_cache import write_cache
+    from data_cleaning import clean_data
+    from data_loading import load_clean_data_chunked, load_data
+    from memory_budget import optimize_memory
+
+    if args.chunksize:
+        print(f"Étape 2: Chargement et nettoyage par blocs de {args.chunksize} lignes...")
+        with span('load_clean_chunked'):
+            df_clean = load_clean_data_chunked(args.data, chunksize=args.chunksize)
+    else:
+        with span('load'):
+            df = load_data(args.data)
+        print(f"Données chargées: {df.shape[0]} lignes et {df.shape[1]} colonnes")
+        print("Étape 2: Nettoyage des données...")
+        with span('clean'):
+            df_clean = clean_data(df, inplace=True)
+    # Types minimaux sans perte, partagés avec le cache ; le relevé garde
+    # l'empreinte d'avant réduction pour --memory-budget
+    _, footprint = optimize_memory(df_clean, inplace=True)
+    if not args.no_cache:
+        with span('cache_write'):
+            write_cache(df_clean, args.data, footprint)
+    return df_clean, footprint
+
+
+def _load_clean(args):
+    """Données nettoyées, lues depuis le cache si possible (Étapes 1 et 2)"""
+    from data_cache import read_cache, read_cache_footprint
+
+    df_clean = None
     print("Étape 1: Chargement des données...")
     try:
-        df = pd.read_csv('data/hotel_bookings.csv')
-        print(f"Données chargées: {df.shape[0]} lignes et {df.shape[1]} colonnes")
+        if not args.no_cache:
+            with span('cache_read'):
+                df_clean = read_cache(args.data)
+        if df_clean is not None:
+            print(f"Données nettoyées lues depuis le cache: {df_clean.shape[0]} lignes")
+            loaded_footprint = read_cache_footprint(args.data)
+        else:
+            print()
+            df_clean, loaded_footprint = _clean_source(args)
     except FileNotFoundError:
         print("Erreur: Fichier de données non trouvé!")
-        print("Le fichier data/hotel_bookings.csv doit être présent dans le projet")
-        return
+        print(f"Le fichier {args.data} doit être présent dans le projet")
+        return None
     except Exception as e:
         print(f"Erreur lors du chargement: {e}")
-        return
-    
-    print()
-    
-    print("Étape 2: Nettoyage des données...")
-    df_clean = clean_data(df)
+        return None
+
     print(f"Données nettoyées: {df_clean.shape[0]} lignes restantes")
     print()
-    
+    if args.memory_budget is not None:
+        df_clean = _apply_memory_budget(df_clean, args.memory_budget, loaded_footprint)
+    return df_clean
+
+
+def _apply_memory_budget(df_clean, budget, loaded_footprint=None):
+    """Ne garde que les colonnes de l'analyse et compare l'empreinte au budget
+
+    Les types ont déjà été réduits avant l'écriture du cache : l'état
+    « avant » affiché est celui des données telles que chargées et
+    nettoyées (`loaded_footprint`), pas celui du DataFrame déjà réduit.
+    """
+    from data_analysis import ANALYSIS_COLUMNS
+    from memory_budget import MB, format_footprint, optimize_memory, rebase_footprint
+
+    print("Réduction de l'empreinte mémoire...")
+    with span('optimize_memory'):
+        df_clean, footprint = optimize_memory(df_clean, keep=ANALYSIS_COLUMNS, inplace=True)
+    if loaded_footprint is not None:
+        footprint = rebase_footprint(footprint, loaded_footprint)
+    print(format_footprint(footprint))
+    used = footprint['bytes_after'].sum() / MB
+    if used > budget:
+        print(f"Attention: {used:.1f} Mo dépassent le budget de {budget:.1f} Mo "
+              "(utiliser --chunksize pour borner la mémoire du chargement)")
+    else:
+        print(f"Empreinte de {used:.1f} Mo dans le budget de {budget:.1f} Mo")
+    print()
+    return df_clean
+
+
+def _analyze(df_clean):
+    from data_analysis import analyze_data
+
     print("Étape 3: Analyse des données...")
-    stats = analyze_data(df_clean)
+    with span('analyze'):
+        stats = analyze_data(df_clean)
     print("Analyse terminée")
     print()
-    
+    return stats
+
+
+def _visualize(df_clean, args):
+    from data_analysis import visualize_data
+
     print("Étape 4: Création des visualisations...")
-    visualize_data(df_clean)
+    with span('visualize'):
+        visualize_data(df_clean, n_workers=args.workers, source=args.data)
     print("Visualisations créées et sauvegardées dans le dossier 'output/'")
     print()
-    
-    print("=" * 60)
-    print("ANALYSE TERMINÉE")
-    print("=" * 60)
+
+
+def _print_summary(stats):
     print("\nRésumé des statistiques principales:")
     print(f"  - Nombre total de réservations: {stats['total_bookings']:,}")
     print(f"  - Taux d'annulation: {stats['cancellation_rate']:.2%}")
@@ -67,6 +201,92 @@ def main():
     print(f"  - Nombre moyen d'adultes: {stats['avg_adults']:.1f}")
 
 
-if __name__ == "__main__":
-    main()
+def run_all(args):
+    print("=" * 60)
+    print("ANALYSE DES RÉSERVATIONS HÔTELIÈRES")
+    print("=" * 60)
+    print()
+
+    df_clean = _load_clean(args)
+    if df_clean is None:
+        return 1
+    stats = _analyze(df_clean)
+    _visualize(df_clean, args)
+
+    print("=" * 60)
+    print("ANALYSE TERMINÉE")
+    print("=" * 60)
+    _print_summary(stats)
+    return 0
+
+
+def run_clean(args):
+    try:
+        df_clean, _ = _clean_source(args)
+    except FileNotFoundError:
+        print(f"Erreur: Fichier de données non trouvé: {args.data}")
+        return 1
+    print(f"Données nettoyées: {df_clean.shape[0]} lignes"
+          + ("" if args.no_cache else " (cache mis à jour)"))
+    return 0
 
+
+def run_stats(args):
+    df_clean = _load_clean(args)
+    if df_clean is None:
+        return 1
+    _print_summary(_analyze(df_clean))
+    return 0
+
+
+def run_charts(args):
+    df_clean = _load_clean(args)
+    if df_clean is None:
+        return 1
+    _visualize(df_clean, args)
+    return 0
+
+
+def run_report(args):
+    from generate_rapport import generate_batch, generate_rapport
+
+    with span('generate_rapport'):
+        if args.batch:
+            generate_batch(args.data, n_workers=args.workers)
+        else:
+            generate_rapport(args.data)
+    return 0
+
+
+COMMAND_HANDLERS = {
+    'all': run_all,
+    'clean': run_clean,
+    'stats': run_stats,
+    'charts': run_charts,
+    'report': run_report,
+}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(format_import_times(args.command, import_modules(COMMAND_IMPORTS[args.command])))
+    print()
+
+    if args.data is None:
+        from data_loading import DATA_PATH
+        args.data = DATA_PATH
+    if args.profile:
+        profiling.enable()
+
+    status = COMMAND_HANDLERS[args.command](args)
+
+    if args.profile:
+        profiling.write_report(profiling.disable(), args.profile_output,
+                               meta={'script': 'main.py', 'command': args.command,
+                                     'data': args.data, 'workers': args.workers,
+                                     'batch': args.batch})
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Réduction de l'empreinte mémoire des données (types minimaux, colonnes utiles)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Une colonne de chaînes devient catégorielle si elle a au plus
+# cette proportion de valeurs distinctes
+CATEGORY_MAX_RATIO = 0.5
+
+INTEGER_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+MB = 1024 * 1024
+
+
+def _narrowest_integer(values):
+    low, high = values.min(), values.max()
+    for dtype in INTEGER_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return None
+
+
+def narrowest_dtype(series, category_ratio=CATEGORY_MAX_RATIO):
+    """Type le plus compact représentant exactement les valeurs de la série
+
+    Entiers : plus petit type signé contenant l'étendue. Flottants : entier si
+    toutes les valeurs sont entières et sans valeur manquante, sinon float32
+    seulement si la conversion est exacte. Chaînes : catégorie si les valeurs
+    distinctes sont peu nombreuses. Retourne None si le type actuel convient.
+    """
+    dtype = series.dtype
+    if len(series) == 0 or isinstance(dtype, pd.CategoricalDtype) or dtype == bool:
+        return None
+
+    if pd.api.types.is_integer_dtype(dtype):
+        target = _narrowest_integer(series.to_numpy())
+    elif pd.api.types.is_float_dtype(dtype):
+        values = series.to_numpy()
+        if not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+            target = _narrowest_integer(values)
+        elif dtype != np.float32 and np.array_equal(values.astype(np.float32).astype(dtype),
+                                                    values, equal_nan=True):
+            target = np.dtype(np.float32)
+        else:
+            target = None
+    elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if series.nunique(dropna=False) <= category_ratio * len(series):
+            return 'category'
+        return None
+    else:
+        return None
+
+    if target is None or target.itemsize >= dtype.itemsize:
+        return None
+    return target
+
+
+def optimize_memory(df, keep=None, category_ratio=CATEGORY_MAX_RATIO, inplace=False):
+    """Réduit l'empreinte mémoire d'un DataFrame sans perte d'information
+
+    Les colonnes absentes de `keep` (si fourni) sont supprimées, puis chaque
+    colonne restante est convertie vers son type le plus compact
+    (narrowest_dtype) ; les catégories inutilisées sont retirées. Les colonnes
+    sont converties une par une, si bien qu'une seule colonne est dupliquée à
+    la fois. Retourne le DataFrame et le relevé d'empreinte par colonne.
+    """
+    if not inplace:
+        df = df.copy()
+    before = df.memory_usage(deep=True, index=False)
+    dtypes_before = df.dtypes.astype(str)
+
+    if keep is not None:
+        dropped = [col for col in df.columns if col not in set(keep)]
+        df.drop(columns=dropped, inplace=True)
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+            continue
+        target = narrowest_dtype(df[col], category_ratio)
+        if target is not None:
+            df[col] = df[col].astype(target)
+
+    after = df.memory_usage(deep=True, index=False)
+    footprint = pd.DataFrame({
+        'dtype_before': dtypes_before,
+        'dtype_after': df.dtypes.astype(str).reindex(dtypes_before.index, fill_value='supprimée'),
+        'bytes_before': before,
+        'bytes_after': after.reindex(before.index, fill_value=0),
+    })
+    footprint.index.name = 'column'
+    return df, footprint
+
+
+def rebase_footprint(footprint, reference):
+    """Relevé d'empreinte dont l'état « avant » est celui de `reference`
+
+    `reference` donne dtype_before et bytes_before par colonne avant une
+    réduction précédente (celle faite avant l'écriture du cache) : sans lui,
+    un DataFrame déjà réduit ne montrerait aucun gain.
+    """
+    footprint = footprint.copy()
+    known = footprint.index.intersection(reference.index)
+    for col in ['dtype_before', 'bytes_before']:
+        footprint.loc[known, col] = reference.loc[known, col]
+    return footprint
+
+
+def format_footprint(footprint):
+    """Tableau texte de l'empreinte mémoire par colonne, avant et après optimisation"""
+    lines = [f"{'Colonne':<32} {'Type avant':<16} {'Type après':<16} {'Avant (Ko)':>11} {'Après (Ko)':>11}"]
+    for col, row in footprint.iterrows():
+        lines.append(f"{col:<32} {row['dtype_before']:<16} {row['dtype_after']:<16} "
+                     f"{row['bytes_before'] / 1024:>11.1f} {row['bytes_after'] / 1024:>11.1f}")
+    total_before = footprint['bytes_before'].sum()
+    total_after = footprint['bytes_after'].sum()
+    ratio = total_before / total_after if total_after else float('inf')
+    lines.append(f"{'Total':<66} {total_before / MB:>9.1f}Mo {total_after / MB:>9.1f}Mo"
+                 f"  (÷{ratio:.1f})")
+    return '\n'.join(lines)
@@ -0,0 +1,158 @@
+"""
+Calendrier d'occupation par nuit et par hôtel (tableaux de différences)
+
+Chaque séjour est ajouté à sa nuit d'arrivée et retiré à sa date de départ ;
+la somme cumulée sur les jours donne, pour chaque nuit, les chambres
+occupées, les clients présents et le revenu. Aucune réservation n'est
+dupliquée par nuit : le coût est proportionnel au nombre de réservations et
+au nombre de jours couverts, pas au nombre de nuitées.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import clean_data
+from data_loading import DATA_PATH, DEFAULT_CHUNKSIZE, iter_chunks
+from deduplication import Deduplicator
+
+# Colonnes des données nettoyées lues par le calendrier
+OCCUPANCY_COLUMNS = ['hotel', 'is_canceled', 'arrival_date', 'total_stay', 'total_people', 'adr']
+
+# Séries par nuit : nom -> colonne pondérant chaque séjour (None : une chambre)
+SERIES = {
+    'room_nights': None,
+    'guests': 'total_people',
+    'revenue': 'adr',
+}
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+class OccupancyCalendar:
+    """Différences par (série, hôtel, jour) sur une plage de jours extensible
+
+    Les jours sont des entiers (jours depuis 1970) ; la plage grandit avec
+    les blocs ajoutés. L'état se met à jour bloc par bloc (update) et se
+    fusionne avec un autre (merge). Seules les réservations non annulées
+    occupent des nuits.
+    """
+
+    def __init__(self):
+        self.hotels = []
+        self.start = None
+        self.diffs = np.zeros((len(SERIES), 0, 0))
+
+    @property
+    def n_days(self):
+        """Nombre de jours couverts (la dernière colonne ne reçoit que des départs)"""
+        return self.diffs.shape[2]
+
+    def _hotel_rows(self, labels):
+        """Ligne du calendrier de chaque libellé d'hôtel (ajoutée au besoin)"""
+        rows = []
+        for label in labels:
+            label = str(label)
+            if label not in self.hotels:
+                self.hotels.append(label)
+            rows.append(self.hotels.index(label))
+        return np.asarray(rows, dtype=np.int64)
+
+    def _resize(self, first_day, end_day):
+        """Étend la plage pour couvrir [first_day, end_day] et toutes les lignes d'hôtel"""
+        start = first_day if self.start is None else min(self.start, first_day)
+        end = end_day if self.start is None else max(self.start + self.n_days - 1, end_day)
+        shape = (len(SERIES), len(self.hotels), end - start + 1)
+        if shape == self.diffs.shape:
+            return
+        diffs = np.zeros(shape)
+        if self.start is not None:
+            offset = self.start - start
+            diffs[:, :self.diffs.shape[1], offset:offset + self.n_days] = self.diffs
+        self.diffs, self.start = diffs, start
+
+    def update(self, df):
+        """Ajoute les séjours d'un bloc de données nettoyées"""
+        stays = df['total_stay'].to_numpy(dtype=np.int64)
+        kept = np.flatnonzero((df['is_canceled'].to_numpy() == 0) & (stays > 0))
+        if not len(kept):
+            return self
+
+        hotel = df['hotel']
+        if isinstance(hotel.dtype, pd.CategoricalDtype):
+            codes, labels = hotel.cat.codes.to_numpy()[kept], hotel.cat.categories
+        else:
+            codes, labels = pd.factorize(hotel.to_numpy()[kept])
+        # Seuls les hôtels ayant des séjours retenus ont une ligne dans le calendrier
+        observed, inverse = np.unique(codes, return_inverse=True)
+        rows = self._hotel_rows(np.asarray(labels)[observed])[inverse]
+        arrival = (df['arrival_date'].to_numpy().astype('datetime64[D]')[kept] - _EPOCH).astype(np.int64)
+        departure = arrival + stays[kept]
+        self._resize(int(arrival.min()), int(departure.max()))
+
+        # Un seul bincount par série : +poids à l'arrivée, -poids au départ
+        width = self.n_days
+        index = np.concatenate([rows * width + arrival - self.start,
+                                rows * width + departure - self.start])
+        size = len(self.hotels) * width
+        for i, col in enumerate(SERIES.values()):
+            weights = (np.ones(len(kept)) if col is None
+                       else df[col].to_numpy(dtype=np.float64)[kept])
+            counts = np.bincount(index, np.concatenate([weights, -weights]), minlength=size)
+            self.diffs[i] += counts.reshape(len(self.hotels), width)
+        return self
+
+    def merge(self, other):
+        """Fusionne un autre calendrier dans celui-ci"""
+        if other.start is None:
+            return self
+        rows = self._hotel_rows(other.hotels)
+        self._resize(other.start, other.start + other.n_days - 1)
+        offset = other.start - self.start
+        self.diffs[:, rows, offset:offset + other.n_days] += other.diffs
+        return self
+
+    def daily(self):
+        """Séries par nuit et par hôtel (une ligne par date et par hôtel)"""
+        columns = ['date', 'hotel'] + list(SERIES)
+        if self.start is None:
+            return pd.DataFrame(columns=columns)
+        # La dernière colonne (départs uniquement) ne correspond à aucune nuit
+        values = np.cumsum(self.diffs, axis=2)[:, :, :-1]
+        n_nights = values.shape[2]
+        dates = _EPOCH + np.arange(self.start, self.start + n_nights)
+        frame = pd.DataFrame({
+            'date': np.tile(dates, len(self.hotels)).astype('datetime64[ns]'),
+            'hotel': pd.Categorical(np.repeat(self.hotels, n_nights)),
+        })
+        for i, name in enumerate(SERIES):
+            frame[name] = values[i].ravel()
+        frame['room_nights'] = frame['room_nights'].round().astype(np.int64)
+        frame['guests'] = frame['guests'].round().astype(np.int64)
+        frame['revenue'] = frame['revenue'].round(2)
+        return frame
+
+
+def build_calendar(df, chunksize=DEFAULT_CHUNKSIZE):
+    """Calendrier de données nettoyées, ajoutées par tranches de `chunksize` lignes"""
+    calendar = OccupancyCalendar()
+    for start in range(0, len(df), chunksize):
+        calendar.update(df.iloc[start:start + chunksize])
+    return calendar
+
+
+def calendar_from_file(path=DATA_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    """Calendrier d'un fichier CSV nettoyé bloc par bloc (doublons supprimés entre blocs)"""
+    calendar = OccupancyCalendar()
+    dedup = Deduplicator()
+    for chunk in iter_chunks(path, chunksize):
+        calendar.update(clean_data(chunk, inplace=True, dedup=dedup))
+    return calendar
+
+
+def monthly_occupancy(daily):
+    """Nuitées, chambres occupées par nuit (moyenne et pic) et revenu par mois et par hôtel"""
+    month = daily['date'].dt.to_period('M').rename('month')
+    grouped = daily.groupby([month, 'hotel'], observed=True)
+    monthly = grouped.agg(room_nights=('room_nights', 'sum'), avg_rooms=('room_nights', 'mean'),
+                          peak_rooms=('room_nights', 'max'), revenue=('revenue', 'sum'))
+    return monthly.reset_index()
@@ -0,0 +1,164 @@
+"""
+Jeu de données nettoyé partitionné sur disque (hotel / arrival_date_year)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.fs as pafs
+
+from data_cache import CACHE_DIR, cache_key, load_clean_data
+from data_cube import build_cube
+from data_loading import DATA_PATH
+
+STORE_PREFIX = 'partitions_'
+DATA_DIR = 'data'
+STATS_FILE = 'partition_stats.feather'
+SUMMARY_FILE = 'summary.json'
+
+# Dimensions dont les valeurs possibles, et colonnes dont l'étendue, sont
+# enregistrées avec le jeu partitionné
+DIMENSION_COLUMNS = ['market_segment', 'deposit_type', 'country']
+RANGE_COLUMNS = ['adr', 'lead_time']
+
+# Colonnes de partitionnement (style Hive : hotel=.../arrival_date_year=.../)
+PARTITION_SCHEMA = pa.schema([
+    ('hotel', pa.string()),
+    ('arrival_date_year', pa.int16()),
+])
+
+
+def store_path(path=DATA_PATH):
+    """Répertoire du jeu partitionné correspondant à la source et au code actuels
+
+    La clé couvre aussi le code de ce module : un changement de format du
+    jeu partitionné le fait reconstruire. Le nom commence par celui de la
+    source, comme les fichiers du cache des données nettoyées.
+    """
+    module_source = inspect.getsource(sys.modules[__name__])
+    key = hashlib.sha256((cache_key(path) + module_source).encode('utf-8'))
+    return os.path.join(CACHE_DIR, _store_prefix(path) + key.hexdigest()[:16])
+
+
+def _store_prefix(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return f"{STORE_PREFIX}{name}_"
+
+
+def write_partitioned(df, root):
+    """Écrit les données nettoyées partitionnées et leur résumé statistique
+
+    Les fichiers sont au format Arrow IPC non compressé, lisibles par
+    projection mémoire. Le résumé (partition_stats.feather) est le cube
+    d'agrégats : chaque cellule appartient à une seule partition, ce qui
+    permet de répondre aux requêtes d'indicateurs sans lire de lignes.
+
+    Le jeu est construit dans un répertoire temporaire voisin puis mis en
+    place par un rename : un lecteur voit l'ancien jeu ou le nouveau, jamais
+    un répertoire partiel.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.set_column(table.schema.get_field_index('hotel'), 'hotel',
+                             table['hotel'].cast(pa.string()))
+
+    parent, name = os.path.split(root)
+    tmp_root = tempfile.mkdtemp(prefix=f'.{name}.', suffix='.tmp', dir=parent or '.')
+    try:
+        _write_store(df, table, tmp_root)
+    except BaseException:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        raise
+    try:
+        os.rename(tmp_root, root)
+    except OSError:
+        # Un jeu existe déjà à cet emplacement : il est écarté d'un rename,
+        # le nouveau prend sa place, et l'ancien n'est supprimé qu'ensuite
+        old_root = tmp_root[:-len('.tmp')] + '.old'
+        os.rename(root, old_root)
+        os.rename(tmp_root, root)
+        shutil.rmtree(old_root, ignore_errors=True)
+    return root
+
+
+def _write_store(df, table, root):
+    """Fichiers des partitions, cube d'agrégats et résumé, dans `root`"""
+    ds.write_dataset(table, os.path.join(root, DATA_DIR), format='ipc',
+                     partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'))
+    feather.write_feather(build_cube(df), os.path.join(root, STATS_FILE),
+                          compression='uncompressed')
+    summary = {
+        'values': {col: sorted(df[col].dropna().astype(str).unique().tolist())
+                   for col in DIMENSION_COLUMNS},
+        'ranges': {col: [float(df[col].min()), float(df[col].max())]
+                   for col in RANGE_COLUMNS},
+    }
+    with open(os.path.join(root, SUMMARY_FILE), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+
+
+def ensure_store(path=DATA_PATH):
+    """Retourne le jeu partitionné à jour, en le construisant si nécessaire"""
+    root = store_path(path)
+    if os.path.exists(os.path.join(root, STATS_FILE)):
+        return root
+
+    write_partitioned(load_clean_data(path), root)
+    # Versions périmées du jeu de la même source uniquement
+    prefix = _store_prefix(path)
+    for entry in os.listdir(CACHE_DIR):
+        stale = os.path.join(CACHE_DIR, entry)
+        if (entry.startswith(prefix) and '_' not in entry[len(prefix):]
+                and stale != root and os.path.isdir(stale)):
+            shutil.rmtree(stale)
+    return root
+
+
+def read_partition_stats(root):
+    """Résumé statistique des partitions (cube d'agrégats), sans lire de lignes"""
+    return feather.read_table(os.path.join(root, STATS_FILE), memory_map=True).to_pandas()
+
+
+def read_store_summary(root):
+    """Valeurs possibles des dimensions de filtrage et étendue des colonnes numériques"""
+    with open(os.path.join(root, SUMMARY_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _filter_expression(schema, hotels=None, years=None, months=None):
+    expression = None
+    for field, values in (('hotel', hotels), ('arrival_date_year', years),
+                          ('arrival_month_num', months)):
+        if values is None:
+            continue
+        value_set = pa.array([v.item() if hasattr(v, 'item') else v for v in values],
+                             type=schema.field(field).type)
+        condition = ds.field(field).isin(value_set)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_partitioned(root, hotels=None, years=None, months=None, columns=None):
+    """Lit les réservations des partitions sélectionnées
+
+    Les filtres sur hotel et arrival_date_year éliminent des partitions
+    entières ; le filtre sur les mois (numéros) est appliqué pendant la
+    lecture. Seules les colonnes demandées sont lues, par projection mémoire
+    des fichiers des partitions retenues.
+    """
+    dataset = ds.dataset(os.path.join(root, DATA_DIR), format='ipc',
+                         filesystem=pafs.LocalFileSystem(use_mmap=True),
+                         partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'))
+    table = dataset.to_table(columns=columns,
+                             filter=_filter_expression(dataset.schema, hotels, years, months))
+    df = table.to_pandas()
+    if 'hotel' in df.columns:
+        df['hotel'] = df['hotel'].astype('category')
+    return df
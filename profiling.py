@@ -0,0 +1,248 @@
+"""
+Instrumentation du pipeline : temps, CPU et mémoire par étape
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+MB = 1024 * 1024
+
+RECORD_FIELDS = ['name', 'category', 'parent', 'depth', 'start_s', 'wall_s', 'cpu_s',
+                 'tracemalloc_peak_mb', 'rss_peak_mb']
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus (Mo), si la plateforme le fournit"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kio sous Linux, octets sous macOS
+    return peak / MB if sys.platform == 'darwin' else peak / 1024
+
+
+class Profiler:
+    """Mesures imbriquées : temps mur, temps CPU, pic tracemalloc et pic RSS
+
+    Chaque mesure (span) enregistre le pic d'allocations Python atteint
+    pendant son exécution, au-delà de la mémoire déjà allouée à son début ;
+    les mesures imbriquées remontent leur pic à la mesure englobante. Le pic
+    RSS est celui du processus depuis son démarrage. tracemalloc étant
+    global au processus, les pics de profileurs utilisés en parallèle dans
+    plusieurs threads incluent les allocations des autres threads.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+        self._holds_tracing = False
+        self._checkpoint = None
+        self._origin = time.perf_counter()
+
+    def start(self):
+        if self.trace_memory and not self._holds_tracing:
+            _acquire_tracing()
+            self._holds_tracing = True
+        self._origin = time.perf_counter()
+        return self
+
+    def stop(self):
+        self.end_checkpoint()
+        if self._holds_tracing:
+            _release_tracing()
+            self._holds_tracing = False
+        return self
+
+    @contextmanager
+    def span(self, name, category='stage'):
+        """Mesure le bloc exécuté dans le contexte"""
+        tracing = tracemalloc.is_tracing()
+        frame = {'name': name, 'start_memory': 0, 'peak': 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_memory'] = current
+        parent = self._stack[-1]['name'] if self._stack else None
+        self._stack.append(frame)
+
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+            self._stack.pop()
+            peak_mb = None
+            if tracing and tracemalloc.is_tracing():
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+                peak_mb = (peak - frame['start_memory']) / MB
+            self.add(name, category, wall, cpu, peak_mb, parent=parent,
+                     start=start_wall - self._origin)
+
+    def add(self, name, category, wall_s, cpu_s, tracemalloc_peak_mb=None, parent=None,
+            start=None, rss_peak_mb=None):
+        """Ajoute une mesure prise ailleurs (par exemple dans un processus de rendu)"""
+        if parent is None and self._stack:
+            parent = self._stack[-1]['name']
+        self.records.append({
+            'name': name,
+            'category': category,
+            'parent': parent,
+            'depth': len(self._stack),
+            'start_s': time.perf_counter() - self._origin if start is None else start,
+            'wall_s': wall_s,
+            'cpu_s': cpu_s,
+            'tracemalloc_peak_mb': tracemalloc_peak_mb,
+            'rss_peak_mb': peak_rss_mb() if rss_peak_mb is None else rss_peak_mb,
+        })
+
+    def checkpoint(self, name, category='section'):
+        """Termine la section en cours et en ouvre une nouvelle
+
+        Pratique pour un script linéaire (app Streamlit) : chaque section
+        court jusqu'au point de contrôle suivant ou jusqu'à stop().
+        """
+        self.end_checkpoint()
+        self._checkpoint = self.span(name, category)
+        self._checkpoint.__enter__()
+
+    def end_checkpoint(self):
+        if self._checkpoint is not None:
+            checkpoint, self._checkpoint = self._checkpoint, None
+            checkpoint.__exit__(None, None, None)
+
+    def sorted_records(self):
+        return sorted(self.records, key=lambda r: (r['start_s'], r['depth']))
+
+    def summary(self):
+        """Tableau texte des mesures, dans l'ordre d'exécution"""
+        lines = [f"{'Étape':<36} {'Catégorie':<11} {'Mur (s)':>9} {'CPU (s)':>9} "
+                 f"{'Pic Python (Mo)':>16} {'Pic RSS (Mo)':>13}"]
+        for r in self.sorted_records():
+            peak = '' if r['tracemalloc_peak_mb'] is None else f"{r['tracemalloc_peak_mb']:.1f}"
+            rss = '' if r['rss_peak_mb'] is None else f"{r['rss_peak_mb']:.1f}"
+            name = ('  ' * r['depth'] + r['name'])[:36]
+            lines.append(f"{name:<36} {r['category']:<11} {r['wall_s']:>9.3f} {r['cpu_s']:>9.3f} "
+                         f"{peak:>16} {rss:>13}")
+        return '\n'.join(lines)
+
+    def write_json(self, path, meta=None):
+        _makedirs_for(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta or {}, 'records': self.sorted_records()}, f, indent=2)
+        return path
+
+    def write_csv(self, path, append=False, extra=None):
+        """Écrit les mesures en CSV ; `extra` ajoute des colonnes constantes (ex. numéro d'exécution)"""
+        _makedirs_for(path)
+        extra = extra or {}
+        fields = list(extra) + RECORD_FIELDS
+        # Plusieurs threads (sessions Streamlit) peuvent compléter le même fichier
+        with _write_lock:
+            write_header = not (append and os.path.exists(path))
+            with open(path, 'a' if append else 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                if write_header:
+                    writer.writeheader()
+                for record in self.sorted_records():
+                    writer.writerow({**extra, **record})
+        return path
+
+
+def _makedirs_for(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+_write_lock = threading.Lock()
+
+# tracemalloc est global au processus : il reste actif tant qu'un profileur
+# qui l'utilise n'est pas arrêté, et n'est arrêté que s'il a été démarré ici
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+# Profileur actif, propre à chaque thread (une exécution de l'app Streamlit
+# par session) : les points de mesure du code ne coûtent rien tant
+# qu'aucun profileur n'est activé dans le thread
+_local = threading.local()
+
+
+def enable(profiler=None):
+    """Active un profileur pour les points de mesure du thread courant et le retourne
+
+    Un profileur encore actif dans ce thread (exécution interrompue) est
+    d'abord arrêté.
+    """
+    disable()
+    _local.profiler = (profiler or Profiler()).start()
+    return _local.profiler
+
+
+def disable():
+    """Désactive le profileur actif du thread courant et le retourne"""
+    profiler = active_profiler()
+    _local.profiler = None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def active_profiler():
+    return getattr(_local, 'profiler', None)
+
+
+def span(name, category='stage'):
+    """Point de mesure : contexte mesuré si un profileur est actif, neutre sinon"""
+    profiler = active_profiler()
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(name, category)
+
+
+def checkpoint(name, category='section'):
+    """Point de contrôle séquentiel du profileur actif (sans effet sinon)"""
+    profiler = active_profiler()
+    if profiler is not None:
+        profiler.checkpoint(name, category)
+
+
+def write_report(profiler, prefix, meta=None):
+    """Écrit la trace (<prefix>.json et <prefix>.csv) et affiche le tableau récapitulatif"""
+    profiler.stop()
+    json_path = profiler.write_json(prefix + '.json', meta)
+    csv_path = profiler.write_csv(prefix + '.csv')
+    print()
+    print(profiler.summary())
+    print(f"\nTrace de profilage écrite dans {json_path} et {csv_path}")
@@ -0,0 +1,102 @@
+"""
+Mémorisation des calculs par section du tableau de bord (LRU borné, expiration)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_TTL = 600
+
+
+class SectionCache:
+    """Résultats mémorisés par section et par clé, avec compteurs
+
+    Chaque section a sa propre capacité : au-delà, l'entrée la moins
+    récemment utilisée est évincée. Une entrée plus ancienne que `ttl`
+    secondes est recalculée. Les résultats sont partagés entre les appels et
+    ne doivent pas être modifiés par l'appelant.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sections = {}
+
+    def _section(self, name, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        if name not in self._sections:
+            self._sections[name] = {
+                'entries': OrderedDict(), 'max_entries': max_entries, 'ttl': ttl,
+                'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'compute_s': 0.0,
+            }
+        return self._sections[name]
+
+    def get_or_compute(self, name, key, compute):
+        """Retourne le résultat mémorisé pour (section, clé), ou le calcule"""
+        with self._lock:
+            section = self._section(name)
+            entry = section['entries'].get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if section['ttl'] is None or time.monotonic() - stored_at <= section['ttl']:
+                    section['entries'].move_to_end(key)
+                    section['hits'] += 1
+                    return value
+                del section['entries'][key]
+                section['expirations'] += 1
+            section['misses'] += 1
+
+        # Calcul hors verrou : les autres sessions ne sont pas bloquées
+        start = time.perf_counter()
+        value = compute()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            section['compute_s'] += elapsed
+            section['entries'][key] = (time.monotonic(), value)
+            section['entries'].move_to_end(key)
+            while len(section['entries']) > section['max_entries']:
+                section['entries'].popitem(last=False)
+                section['evictions'] += 1
+        return value
+
+    def configure(self, name, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        """Déclare une section et sa capacité (sans effet si elle existe déjà)"""
+        with self._lock:
+            self._section(name, max_entries, ttl)
+
+    def memoize(self, name, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        """Décorateur : mémorise une fonction pure de ses arguments (hachables)"""
+        self.configure(name, max_entries, ttl)
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args):
+                return self.get_or_compute(name, args, lambda: func(*args))
+            return wrapper
+        return decorator
+
+    def clear(self):
+        """Vide les résultats en conservant les compteurs"""
+        with self._lock:
+            for section in self._sections.values():
+                section['entries'].clear()
+
+    def stats(self):
+        """Compteurs par section : succès, échecs, évictions, entrées et temps de calcul"""
+        with self._lock:
+            rows = []
+            for name, section in self._sections.items():
+                calls = section['hits'] + section['misses']
+                rows.append({
+                    'section': name,
+                    'hits': section['hits'],
+                    'misses': section['misses'],
+                    'hit_rate': section['hits'] / calls if calls else None,
+                    'entries': len(section['entries']),
+                    'evictions': section['evictions'],
+                    'expirations': section['expirations'],
+                    'compute_s': section['compute_s'],
+                })
+            return rows
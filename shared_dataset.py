@@ -0,0 +1,121 @@
+"""
+Données nettoyées partagées sans copie (fichier Arrow IPC projeté en mémoire)
+"""
+
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from data_cache import cache_path, load_clean_data
+from data_loading import DATA_PATH
+
+
+def _column_values(column):
+    """Valeurs d'une colonne Arrow en vue NumPy/pandas sur le tampon projeté
+
+    Les colonnes dictionnaire deviennent des catégories dont les codes sont
+    les indices Arrow eux-mêmes. Une colonne contenant des valeurs
+    manquantes ne peut pas être vue sans copie : elle est convertie.
+    """
+    array = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    if pa.types.is_dictionary(array.type):
+        indices = array.indices.fill_null(-1) if array.null_count else array.indices
+        dtype = pd.CategoricalDtype(array.dictionary.to_pylist(), ordered=array.type.ordered)
+        return pd.Categorical.from_codes(indices.to_numpy(zero_copy_only=True), dtype=dtype)
+    try:
+        return array.to_numpy(zero_copy_only=True)
+    except pa.ArrowInvalid:
+        return array.to_pandas()
+
+
+class SharedDataset:
+    """Données nettoyées lues par projection mémoire, en lecture seule
+
+    Les colonnes du DataFrame `df` sont des vues sur le fichier projeté :
+    l'ouvrir ne copie aucune donnée, et les pages lues sont celles du cache
+    du système, partagées par toutes les sessions et tous les processus qui
+    ouvrent le même fichier. Les tableaux ne sont pas modifiables ; avec la
+    copie à l'écriture de pandas, une modification produit une copie locale.
+    """
+
+    def __init__(self, arrow_path, source=DATA_PATH):
+        self.path = arrow_path
+        self._source_path = source
+        self._source_stat = _stat_key(source)
+        self._source = pa.memory_map(arrow_path, 'r')
+        self.table = ipc.open_file(self._source).read_all()
+        self.df = pd.DataFrame({name: pd.Series(_column_values(self.table.column(name)), name=name,
+                                                copy=False)
+                                for name in self.table.column_names}, copy=False)
+
+    @property
+    def mapped_bytes(self):
+        return os.path.getsize(self.path)
+
+    def frame(self, columns=None):
+        """Vue des colonnes demandées (sans copie)
+
+        Le DataFrame est construit à partir des Series existantes plutôt
+        que par sélection (df[colonnes]), qui copie les données sans la
+        copie à l'écriture de pandas 3.
+        """
+        if columns is None:
+            return self.df
+        return pd.DataFrame({name: self.df[name] for name in columns}, copy=False)
+
+    def is_current(self):
+        """Indique si le fichier source n'a pas changé (taille et date) depuis l'ouverture
+
+        Ne relit ni ne hache rien ; un changement du code de nettoyage n'est
+        pris en compte qu'au prochain reload_shared.
+        """
+        return self._source_stat == _stat_key(self._source_path)
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Un jeu ouvert par processus et par source : les sessions Streamlit et les
+# appels successifs le partagent
+_datasets = {}
+_lock = threading.Lock()
+
+
+def open_shared(path=DATA_PATH):
+    """Jeu partagé correspondant aux données actuelles de la source
+
+    Le fichier projeté est le cache des données nettoyées (data_cache), créé
+    au besoin. Un processus de calcul (initialiseur d'un pool) appelle cette
+    fonction pour lire les mêmes pages que le processus principal. Le
+    chemin du cache (empreintes de la source et du code) n'est calculé qu'à
+    la première ouverture et après reload_shared : les appels suivants
+    retournent le jeu déjà ouvert.
+    """
+    key = os.path.abspath(path)
+    with _lock:
+        dataset = _datasets.get(key)
+        if dataset is not None:
+            return dataset
+        arrow_path = cache_path(path)
+        if not os.path.exists(arrow_path):
+            load_clean_data(path)
+        dataset = SharedDataset(arrow_path, source=path)
+        _datasets[key] = dataset
+        return dataset
+
+
+def reload_shared(path=DATA_PATH):
+    """Oublie le jeu ouvert pour la source et rouvre ses données actuelles
+
+    À appeler quand le fichier source a changé. Les vues déjà distribuées
+    restent valides : elles gardent l'ancien fichier projeté jusqu'à leur
+    libération.
+    """
+    with _lock:
+        _datasets.pop(os.path.abspath(path), None)
+    return open_shared(path)
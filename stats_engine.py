@@ -0,0 +1,120 @@
+"""
+Agrégats additifs des réservations (état fusionnable des statistiques)
+"""
+
+import json
+import os
+
+import numpy as np
+
+from data_cleaning import MONTH_NAMES
+from profiling import span
+
+
+class BookingAggregates:
+    """Compteurs et sommes suffisants pour reconstruire les statistiques de analyze_data
+
+    L'état se met à jour bloc par bloc (update), se fusionne avec un autre
+    état (merge) et se sauvegarde en JSON : ajouter de nouvelles réservations
+    ne nécessite pas de relire l'historique.
+    """
+
+    SUMS = {
+        'canceled': 'is_canceled',
+        'adr_sum': 'adr',
+        'stay_sum': 'total_stay',
+        'adults_sum': 'adults',
+        'revenue_sum': 'total_revenue',
+    }
+
+    def __init__(self):
+        self.total = 0
+        self.sums = {name: 0.0 for name in self.SUMS}
+        self.hotel_counts = {}
+        # Nombre de réservations par mois d'arrivée, indexé par arrival_year_month
+        self.month_counts = {}
+
+    def update(self, df):
+        """Ajoute les réservations d'un bloc de données nettoyées (un seul passage)"""
+        if len(df) == 0:
+            return self
+        self.total += len(df)
+        for name, col in self.SUMS.items():
+            with span(name, 'stat'):
+                self.sums[name] += float(np.sum(df[col].to_numpy(), dtype=np.float64))
+
+        with span('hotel_counts', 'stat'):
+            for hotel, count in df['hotel'].value_counts(sort=False).items():
+                if count:
+                    self.hotel_counts[str(hotel)] = self.hotel_counts.get(str(hotel), 0) + int(count)
+
+        with span('month_counts', 'stat'):
+            codes = df['arrival_year_month'].to_numpy(dtype=np.int64)
+            base = int(codes.min())
+            counts = np.bincount(codes - base)
+            for offset in np.flatnonzero(counts):
+                code = base + int(offset)
+                self.month_counts[code] = self.month_counts.get(code, 0) + int(counts[offset])
+        return self
+
+    def merge(self, other):
+        """Fusionne un autre état dans celui-ci"""
+        self.total += other.total
+        for name in self.SUMS:
+            self.sums[name] += other.sums[name]
+        for hotel, count in other.hotel_counts.items():
+            self.hotel_counts[hotel] = self.hotel_counts.get(hotel, 0) + count
+        for code, count in other.month_counts.items():
+            self.month_counts[code] = self.month_counts.get(code, 0) + count
+        return self
+
+    def busiest_month(self):
+        """Mois d'arrivée le plus chargé (le plus ancien en cas d'égalité)"""
+        if not self.month_counts:
+            return None
+        code = min(self.month_counts, key=lambda c: (-self.month_counts[c], c))
+        year, month = divmod(code, 12)
+        return f"{MONTH_NAMES[month]} {year}"
+
+    def to_stats(self):
+        """Statistiques au format retourné par analyze_data"""
+        total = self.total or np.nan
+        return {
+            'total_bookings': self.total,
+            'cancellation_rate': self.sums['canceled'] / total,
+            'avg_price': self.sums['adr_sum'] / total,
+            'avg_stay': self.sums['stay_sum'] / total,
+            'avg_adults': self.sums['adults_sum'] / total,
+            'total_revenue': self.sums['revenue_sum'],
+            'city_hotel_bookings': self.hotel_counts.get('City Hotel', 0),
+            'resort_hotel_bookings': self.hotel_counts.get('Resort Hotel', 0),
+            'busiest_month': self.busiest_month(),
+        }
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'sums': self.sums,
+            'hotel_counts': self.hotel_counts,
+            'month_counts': {str(code): count for code, count in self.month_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.total = data['total']
+        state.sums.update(data['sums'])
+        state.hotel_counts = dict(data['hotel_counts'])
+        state.month_counts = {int(code): count for code, count in data['month_counts'].items()}
+        return state
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,266 @@
+"""
+Générateur de réservations synthétiques au format de hotel_bookings.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from data_cleaning import MONTH_NAMES
+from data_loading import BOOKING_DTYPES, DATE_COLUMNS, DATE_FORMAT
+
+COLUMNS = list(BOOKING_DTYPES) + DATE_COLUMNS
+# Types Arrow des colonnes écrites : identiques pour tous les blocs
+SCHEMA = pa.schema(
+    [(col, pa.string() if dtype == 'category'
+      else pa.float64() if dtype.startswith('float') else pa.int64())
+     for col, dtype in BOOKING_DTYPES.items()]
+    + [(col, pa.string()) for col in DATE_COLUMNS]
+)
+DEFAULT_SEED = 42
+DEFAULT_CHUNKSIZE = 1_000_000
+
+# Part de lignes dupliquées à l'identique (environ un quart dans le fichier Kaggle)
+DUPLICATE_RATE = 0.25
+
+FIRST_ARRIVAL = '2015-07-01'
+LAST_ARRIVAL = '2017-08-31'
+
+# Poids relatifs des mois d'arrivée (janvier à décembre)
+MONTH_WEIGHTS = np.array([5.9, 8.1, 9.8, 11.1, 11.8, 10.9, 12.7, 13.9, 10.5, 11.2, 6.8, 6.8])
+
+HOTELS = {'City Hotel': 0.66, 'Resort Hotel': 0.34}
+CANCEL_RATES = {'City Hotel': 0.38, 'Resort Hotel': 0.24}
+# Prix moyen par hôtel et par mois (janvier à décembre)
+SEASONAL_ADR = {
+    'City Hotel': [83, 86, 92, 111, 121, 118, 116, 118, 112, 102, 89, 88],
+    'Resort Hotel': [49, 55, 57, 77, 77, 110, 156, 182, 97, 62, 49, 69],
+}
+
+MEALS = {'BB': 0.773, 'HB': 0.121, 'SC': 0.089, 'Undefined': 0.010, 'FB': 0.007}
+COUNTRIES = {
+    'PRT': 0.407, 'GBR': 0.102, 'FRA': 0.087, 'ESP': 0.072, 'DEU': 0.061,
+    'ITA': 0.032, 'IRL': 0.028, 'BEL': 0.020, 'BRA': 0.019, 'NLD': 0.018,
+    'USA': 0.018, 'CHE': 0.014, 'CN': 0.011, 'AUT': 0.011, 'SWE': 0.009,
+    'CHN': 0.008, 'POL': 0.008, 'ISR': 0.006, 'RUS': 0.005, 'NOR': 0.005,
+    'ROU': 0.004, 'FIN': 0.004, 'DNK': 0.003, 'AUS': 0.003, 'AGO': 0.003,
+    'MAR': 0.002, 'LUX': 0.002, 'TUR': 0.002, 'HUN': 0.002, None: 0.004,
+}
+MARKET_SEGMENTS = {
+    'Online TA': 0.473, 'Offline TA/TO': 0.203, 'Groups': 0.166, 'Direct': 0.106,
+    'Corporate': 0.044, 'Complementary': 0.006, 'Aviation': 0.002,
+}
+DISTRIBUTION_CHANNELS = {
+    'Online TA': 'TA/TO', 'Offline TA/TO': 'TA/TO', 'Groups': 'TA/TO',
+    'Direct': 'Direct', 'Corporate': 'Corporate', 'Complementary': 'Direct',
+    'Aviation': 'Corporate',
+}
+ROOM_TYPES = {'A': 0.720, 'D': 0.161, 'E': 0.055, 'F': 0.024, 'G': 0.018,
+              'B': 0.009, 'C': 0.008, 'H': 0.005}
+DEPOSIT_TYPES = {'No Deposit': 0.876, 'Non Refund': 0.122, 'Refundable': 0.002}
+CUSTOMER_TYPES = {'Transient': 0.750, 'Transient-Party': 0.211, 'Contract': 0.034,
+                  'Group': 0.005}
+AGENTS = {9: 0.312, 240: 0.135, 1: 0.069, 14: 0.035, 7: 0.034, 6: 0.032, 250: 0.029,
+          241: 0.017, 28: 0.016, 8: 0.014, 3: 0.012, 37: 0.012, 19: 0.010, 40: 0.010,
+          314: 0.009}
+COMPANIES = [40, 223, 67, 45, 153, 174, 219, 281, 154, 405]
+
+
+def parse_size(text):
+    """Convertit une taille lisible ('100k', '1M', '50M') en nombre de lignes"""
+    text = str(text).strip().upper().replace('_', '')
+    factor = 1
+    if text.endswith('K'):
+        factor, text = 1_000, text[:-1]
+    elif text.endswith('M'):
+        factor, text = 1_000_000, text[:-1]
+    return int(float(text) * factor)
+
+
+def format_size(n_rows):
+    """Écriture courte d'un nombre de lignes ('100k', '1M', '50M')"""
+    if n_rows % 1_000_000 == 0:
+        return f"{n_rows // 1_000_000}M"
+    if n_rows % 1_000 == 0:
+        return f"{n_rows // 1_000}k"
+    return str(n_rows)
+
+
+def _choice(rng, distribution, n):
+    values = list(distribution)
+    p = np.array(list(distribution.values()), dtype=np.float64)
+    return np.array(values, dtype=object)[rng.choice(len(values), size=n, p=p / p.sum())]
+
+
+def _arrival_dates(rng, n):
+    dates = pd.date_range(FIRST_ARRIVAL, LAST_ARRIVAL, freq='D')
+    weights = MONTH_WEIGHTS[dates.month - 1] / dates.days_in_month.to_numpy()
+    return dates[rng.choice(len(dates), size=n, p=weights / weights.sum())]
+
+
+def generate_bookings(n_rows, rng, duplicate_rate=DUPLICATE_RATE):
+    """Génère `n_rows` réservations brutes avec des distributions réalistes
+
+    Les colonnes, leur ordre et leurs valeurs suivent hotel_bookings.csv :
+    saisonnalité des arrivées et des prix, annulations plus fréquentes au
+    City Hotel et pour les dépôts non remboursables, valeurs manquantes
+    (country, agent, company, children), quelques valeurs aberrantes et une
+    part `duplicate_rate` de lignes dupliquées à l'identique.
+    """
+    n_duplicates = int(n_rows * duplicate_rate)
+    n = n_rows - n_duplicates
+
+    hotel = _choice(rng, HOTELS, n)
+    is_city = hotel == 'City Hotel'
+    arrival = _arrival_dates(rng, n)
+    month = arrival.month.to_numpy()
+
+    deposit_type = _choice(rng, DEPOSIT_TYPES, n)
+    cancel_rate = np.where(is_city, CANCEL_RATES['City Hotel'], CANCEL_RATES['Resort Hotel'])
+    cancel_rate = np.where(deposit_type == 'Non Refund', 0.99, cancel_rate)
+    is_canceled = (rng.random(n) < cancel_rate).astype(np.int8)
+
+    lead_time = np.minimum(rng.exponential(np.where(is_canceled, 145.0, 80.0)), 737).astype(int)
+
+    # Durée du séjour, puis répartition entre nuits de week-end et de semaine
+    total_stay = 1 + rng.poisson(np.where(is_city, 2.0, 3.4))
+    total_stay[rng.random(n) < 0.006] = 0
+    weekend_nights = rng.binomial(total_stay, 2 / 7)
+
+    adults = rng.choice([0, 1, 2, 3, 4], size=n, p=[0.003, 0.190, 0.750, 0.052, 0.005])
+    children = rng.choice([0, 1, 2, 3], size=n, p=[0.928, 0.041, 0.030, 0.001]).astype(float)
+    children[rng.random(n) < 0.00005] = np.nan
+    babies = rng.choice([0, 1, 2], size=n, p=[0.9920, 0.0076, 0.0004])
+
+    market_segment = _choice(rng, MARKET_SEGMENTS, n)
+    distribution_channel = pd.Series(market_segment).map(DISTRIBUTION_CHANNELS).to_numpy()
+    is_repeated_guest = (rng.random(n) < 0.032).astype(np.int8)
+
+    reserved_room_type = _choice(rng, ROOM_TYPES, n)
+    assigned_room_type = np.where(rng.random(n) < 0.875, reserved_room_type,
+                                  _choice(rng, ROOM_TYPES, n))
+
+    agent = _choice(rng, AGENTS, n).astype(float)
+    agent[rng.random(n) < 0.137] = np.nan
+    company = rng.choice(COMPANIES, size=n).astype(float)
+    company[rng.random(n) >= 0.057] = np.nan
+
+    waiting = np.where(rng.random(n) < 0.969, 0, rng.exponential(50.0, n)).astype(int)
+
+    adr_mean = np.where(is_city, np.take(SEASONAL_ADR['City Hotel'], month - 1),
+                        np.take(SEASONAL_ADR['Resort Hotel'], month - 1))
+    adr = np.round(rng.gamma(6.0, adr_mean / 6.0), 2)
+    adr[rng.random(n) < 0.016] = 0.0
+    adr[rng.random(n) < 0.00001] = -6.38
+    adr[rng.random(n) < 0.00001] = 5400.0
+
+    no_show = rng.random(n) < 0.03
+    reservation_status = np.where(is_canceled == 0, 'Check-Out',
+                                  np.where(no_show, 'No-Show', 'Canceled'))
+    status_offset = np.where(is_canceled == 0, total_stay,
+                             -(rng.random(n) * (lead_time + 1)).astype(int))
+    status_date = arrival + pd.to_timedelta(status_offset, unit='D')
+
+    df = pd.DataFrame({
+        'hotel': hotel,
+        'is_canceled': is_canceled,
+        'lead_time': lead_time,
+        'arrival_date_year': arrival.year,
+        'arrival_date_month': np.array(MONTH_NAMES, dtype=object)[month - 1],
+        'arrival_date_week_number': arrival.isocalendar().week.to_numpy(),
+        'arrival_date_day_of_month': arrival.day,
+        'stays_in_weekend_nights': weekend_nights,
+        'stays_in_week_nights': total_stay - weekend_nights,
+        'adults': adults,
+        'children': children,
+        'babies': babies,
+        'meal': _choice(rng, MEALS, n),
+        'country': _choice(rng, COUNTRIES, n),
+        'market_segment': market_segment,
+        'distribution_channel': distribution_channel,
+        'is_repeated_guest': is_repeated_guest,
+        'previous_cancellations': rng.poisson(0.087, n),
+        'previous_bookings_not_canceled': np.where(is_repeated_guest, rng.poisson(2.0, n), 0),
+        'reserved_room_type': reserved_room_type,
+        'assigned_room_type': assigned_room_type,
+        'booking_changes': rng.poisson(0.22, n),
+        'deposit_type': deposit_type,
+        'agent': agent,
+        'company': company,
+        'days_in_waiting_list': waiting,
+        'customer_type': _choice(rng, CUSTOMER_TYPES, n),
+        'adr': adr,
+        'required_car_parking_spaces': rng.choice([0, 1, 2], size=n, p=[0.9377, 0.0620, 0.0003]),
+        'total_of_special_requests': np.minimum(rng.poisson(0.57, n), 5),
+        'reservation_status': reservation_status,
+        'reservation_status_date': status_date.strftime(DATE_FORMAT),
+    }, columns=COLUMNS)
+
+    if n_duplicates and n:
+        sources = rng.integers(0, n, size=n_duplicates)
+        order = rng.permutation(n_rows)
+        df = pd.concat([df, df.iloc[sources]], ignore_index=True).iloc[order]
+    return df.reset_index(drop=True)
+
+
+def write_synthetic_csv(path, n_rows, seed=DEFAULT_SEED, chunksize=DEFAULT_CHUNKSIZE,
+                        duplicate_rate=DUPLICATE_RATE):
+    """Écrit `n_rows` réservations synthétiques dans `path`, bloc par bloc
+
+    Chaque bloc a son propre générateur dérivé de `seed` : le fichier est
+    reproductible et la mémoire utilisée ne dépend que de `chunksize`.
+    L'écriture passe par le writer CSV d'Arrow (chaînes entre guillemets,
+    valeurs manquantes laissées vides), bien plus rapide que DataFrame.to_csv.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    n_chunks = max(1, -(-n_rows // chunksize))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tmp_path = path + '.tmp'
+    writer = None
+    try:
+        for i, chunk_seed in enumerate(seeds):
+            size = min(chunksize, n_rows - i * chunksize)
+            chunk = generate_bookings(size, np.random.default_rng(chunk_seed), duplicate_rate)
+            table = pa.Table.from_pandas(chunk, schema=SCHEMA, preserve_index=False)
+            if writer is None:
+                writer = pa_csv.CSVWriter(tmp_path, SCHEMA)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Génère un fichier de réservations synthétiques")
+    parser.add_argument('size', help="Nombre de lignes (ex. 100k, 1M, 50M)")
+    parser.add_argument('--output', default=None,
+                        help="Fichier CSV à écrire (défaut : data/synthetic_<taille>.csv)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="Graine du générateur aléatoire")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Nombre de lignes générées par bloc")
+    parser.add_argument('--duplicate-rate', type=float, default=DUPLICATE_RATE,
+                        help="Part de lignes dupliquées à l'identique")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    n_rows = parse_size(args.size)
+    output = args.output or os.path.join('data', f"synthetic_{format_size(n_rows)}.csv")
+    write_synthetic_csv(output, n_rows, seed=args.seed, chunksize=args.chunksize,
+                        duplicate_rate=args.duplicate_rate)
+    print(f"{n_rows:,} réservations synthétiques écrites dans {output}")
+
+
+if __name__ == "__main__":
+    main()
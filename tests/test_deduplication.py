@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from deduplication import Deduplicator, row_fingerprints
+
+
+def test_all_missing_categorical_chunk():
+    # Un bloc dont la colonne catégorielle est entièrement manquante n'a aucune catégorie
+    empty = pd.DataFrame({'country': pd.Categorical([np.nan, np.nan]), 'adr': [80.0, 95.0]})
+    mixed = pd.DataFrame({'country': pd.Categorical([np.nan, 'PRT', np.nan]),
+                          'adr': [80.0, 60.0, 95.0]})
+    assert len(empty['country'].cat.categories) == 0
+
+    fingerprints = row_fingerprints(empty)
+    assert len(fingerprints) == 2
+    # Mêmes valeurs, mêmes empreintes quel que soit le bloc
+    np.testing.assert_array_equal(fingerprints, row_fingerprints(mixed)[[0, 2]])
+
+    dedup = Deduplicator()
+    assert dedup.new_rows(empty).tolist() == [True, True]
+    assert dedup.new_rows(mixed).tolist() == [False, True, False]